@@ -1,8 +1,15 @@
 import os
 import re
-from flask import Flask, request, render_template, redirect, url_for, flash, jsonify
+import queue
+import threading
+from flask import Flask, request, render_template, redirect, url_for, flash, jsonify, Response
 import json
 
+import financial_analysis
+from extraction_jobs import ExtractionJobQueue
+from pipeline_metrics import METRICS
+from results_store import MAX_PAGE_SIZE
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
@@ -10,6 +17,23 @@ app.secret_key = 'your-secret-key-here'
 DATA_SOURCE_DIR = 'data_source'
 FINANCIAL_ANALYSIS_FILE = 'financial_analysis.py'
 CONFIG_FILE = 'config.json'
+OUTPUT_CSV = 'financial_information.csv'
+
+# 后台提取任务队列（首次使用时创建）
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """获取共享的后台提取任务队列"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = ExtractionJobQueue(OUTPUT_CSV)
+        return _job_queue
+
+def get_results_store():
+    """获取与输出CSV对应的结果索引库（与后台任务共用同一连接）"""
+    return get_job_queue().store
 
 def update_api_key_in_file(api_key):
     """更新financial_analysis.py文件中的API密钥"""
@@ -82,6 +106,13 @@ def upload_files():
                 saved_files.append(filename)
         
         flash(f'成功上传 {len(saved_files)} 个文件: {", ".join(saved_files)}', 'success')
+        
+        # 为上传的会议记录创建后台提取任务
+        transcript_paths = [os.path.join(DATA_SOURCE_DIR, f) for f in saved_files
+                            if financial_analysis.is_transcript_file(f)]
+        if transcript_paths:
+            job_id = get_job_queue().submit(transcript_paths)
+            flash(f'已创建提取任务 {job_id}，共 {len(transcript_paths)} 个文件', 'success')
         return redirect(url_for('index'))
         
     except Exception as e:
@@ -101,6 +132,8 @@ def update_api_key():
         if update_api_key_in_file(api_key):
             # 保存到配置文件
             save_config(api_key)
+            # 后台任务立即使用新密钥
+            financial_analysis.set_api_key(api_key)
             flash('API密钥更新成功', 'success')
         else:
             flash('API密钥更新失败', 'error')
@@ -111,9 +144,98 @@ def update_api_key():
         flash(f'更新失败: {str(e)}', 'error')
         return redirect(url_for('index'))
 
+@app.route('/jobs')
+def list_jobs():
+    """所有提取任务的状态"""
+    return jsonify(get_job_queue().list_jobs())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """单个任务的状态及每个文件的进度"""
+    job = get_job_queue().get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/events')
+def job_events():
+    """以server-sent events推送任务进度，可用job_id参数只订阅单个任务"""
+    job_queue = get_job_queue()
+    job_id = request.args.get('job_id')
+    events = job_queue.subscribe()
+    
+    def stream():
+        try:
+            # 先推送当前任务快照
+            snapshot = job_queue.list_jobs()
+            if job_id:
+                snapshot = [job for job in snapshot if job['job_id'] == job_id]
+            yield f"event: snapshot\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+            
+            while True:
+                try:
+                    event = events.get(timeout=15)
+                except queue.Empty:
+                    # 保持连接
+                    yield ": keepalive\n\n"
+                    continue
+                if job_id and event.get('job_id') != job_id:
+                    continue
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            job_queue.unsubscribe(events)
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/statements')
+def query_statements():
+    """
+    按ticker、exchange、category和电话会议日期(from/to, YYYY-MM-DD)筛选提取结果。
+    按日期倒序分页：limit为每页条数，将返回的next_cursor作为cursor参数获取下一页。
+    """
+    store = get_results_store()
+    if store is None:
+        return jsonify({'error': 'results store is disabled'}), 404
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    for name in ('from', 'to'):
+        value = request.args.get(name)
+        if value and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+            return jsonify({'error': f'{name} must be YYYY-MM-DD'}), 400
+    
+    cursor = request.args.get('cursor')
+    if cursor and not re.fullmatch(r'[\d-]*:\d+', cursor):
+        return jsonify({'error': 'invalid cursor'}), 400
+    
+    page = store.query(
+        ticker=request.args.get('ticker'),
+        exchange=request.args.get('exchange'),
+        category=request.args.get('category'),
+        date_from=request.args.get('from'),
+        date_to=request.args.get('to'),
+        limit=min(max(limit, 1), MAX_PAGE_SIZE),
+        cursor=cursor,
+    )
+    return jsonify(page)
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus格式的流水线指标（阶段耗时、token用量、重试、解析失败等）"""
+    client_stats = financial_analysis.get_deepseek_client().stats()
+    return Response(METRICS.render_prometheus(client_stats), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     # 确保data_source目录存在
     if not os.path.exists(DATA_SOURCE_DIR):
         os.makedirs(DATA_SOURCE_DIR)
     
+    # 使用已保存的API密钥
+    saved_api_key = load_config()
+    if saved_api_key:
+        financial_analysis.set_api_key(saved_api_key)
+    
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import os
+import time
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from consolidate_financial_data import FINANCIAL_FIELDS, consolidate_dataframe
+
+# Benchmark parameters
+NUM_ROWS = 1_000_000
+NUM_COMPANIES = 5_000
+CALLS_PER_COMPANY = 8
+FILL_RATE = 0.1          # Share of metric cells holding a value
+SEED = 42
+
+
+def make_synthetic_extraction(num_rows, num_companies, calls_per_company, fill_rate, seed):
+    """
+    Build a DataFrame shaped like financial_information.csv after pd.read_csv.
+    """
+    rng = np.random.default_rng(seed)
+    months = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+    
+    company = rng.integers(0, num_companies, num_rows)
+    call = rng.integers(0, calls_per_company, num_rows)
+    tickers = np.array([f"TCK{i}" for i in range(num_companies)], dtype=object)
+    exchanges = np.array(['N', 'OQ', 'L', 'HK'], dtype=object)
+    
+    df = pd.DataFrame({
+        'year': 2018 + call // 2,
+        'month': months[(call * 3 + company) % 12],
+        'day': (company + call) % 28 + 1,
+        'ticker': tickers[company],
+        'exchange': exchanges[company % len(exchanges)],
+    })
+    df['filename'] = df['year'].astype(str) + '-' + df['month'] + '-' + df['ticker'] + '-Transcript.txt'
+    df['financial_category'] = rng.choice(FINANCIAL_FIELDS, num_rows)
+    df['forward_looking_sentence'] = 'We expect growth next year.'
+    
+    # Mix of percentages (strings) like the real extraction output
+    for field in FINANCIAL_FIELDS:
+        filled = rng.random(num_rows) < fill_rate
+        values = pd.Series(np.round(rng.normal(5, 10, num_rows), 1)).astype(str) + '%'
+        df[field] = values.where(filled)
+    
+    df['speaker'] = 'CFO'
+    df['extraction_date'] = '2024-01-01 00:00:00'
+    return df
+
+
+def consolidate_iterrows(df):
+    """
+    The previous row-by-row implementation, kept as the baseline.
+    """
+    consolidated_data = defaultdict(dict)
+    for index, row in df.iterrows():
+        company_key = (
+            str(row['ticker']) if pd.notna(row['ticker']) else '',
+            str(row['year']) if pd.notna(row['year']) else '',
+            str(row['month']) if pd.notna(row['month']) else '',
+            str(row['day']) if pd.notna(row['day']) else '',
+            str(row['exchange']) if pd.notna(row['exchange']) else ''
+        )
+        if company_key not in consolidated_data:
+            consolidated_data[company_key] = {
+                'year': row['year'] if pd.notna(row['year']) else '',
+                'month': row['month'] if pd.notna(row['month']) else '',
+                'day': row['day'] if pd.notna(row['day']) else '',
+                'ticker': row['ticker'] if pd.notna(row['ticker']) else '',
+                'exchange': row['exchange'] if pd.notna(row['exchange']) else '',
+                'filename': row['filename'] if pd.notna(row['filename']) else ''
+            }
+        for field in FINANCIAL_FIELDS:
+            if pd.notna(row[field]) and row[field] != '':
+                consolidated_data[company_key][field] = row[field]
+    
+    consolidated_df = pd.DataFrame(list(consolidated_data.values()))
+    column_order = ['year', 'month', 'day', 'ticker', 'exchange', 'filename'] + FINANCIAL_FIELDS
+    return consolidated_df[[col for col in column_order if col in consolidated_df.columns]]
+
+
+def same_csv_output(a, b):
+    # Compare what consolidate_financial_data would actually write
+    with tempfile.TemporaryDirectory() as tmp:
+        path_a, path_b = os.path.join(tmp, 'a.csv'), os.path.join(tmp, 'b.csv')
+        a.to_csv(path_a, index=False)
+        b.to_csv(path_b, index=False)
+        with open(path_a, 'rb') as fa, open(path_b, 'rb') as fb:
+            return fa.read() == fb.read()
+
+
+def run_benchmark(num_rows=NUM_ROWS):
+    print(f"Generating {num_rows:,} synthetic extraction rows...")
+    df = make_synthetic_extraction(num_rows, NUM_COMPANIES, CALLS_PER_COMPANY, FILL_RATE, SEED)
+    
+    start = time.perf_counter()
+    vectorized = consolidate_dataframe(df)
+    vectorized_time = time.perf_counter() - start
+    print(f"Vectorized consolidation: {vectorized_time:.2f}s ({len(vectorized):,} records)")
+    
+    start = time.perf_counter()
+    baseline = consolidate_iterrows(df)
+    baseline_time = time.perf_counter() - start
+    print(f"iterrows consolidation:   {baseline_time:.2f}s ({len(baseline):,} records)")
+    
+    print(f"Speedup: {baseline_time / vectorized_time:.1f}x")
+    print(f"Identical CSV output: {same_csv_output(vectorized, baseline)}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,144 @@
+import io
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+
+import financial_analysis
+import pipeline_metrics
+from consolidate_financial_data import consolidate_financial_data
+from mock_deepseek_server import MockDeepSeekServer
+from rate_limiter import RateLimiter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Benchmark parameters
+NUM_TRANSCRIPTS = 200
+TRANSCRIPT_CHARS = 30000          # Approximate size of each synthetic transcript
+MAX_WORKERS = 16
+MOCK_LATENCY_DISTRIBUTION = "lognormal"
+MOCK_LATENCY_MEAN = 0.2
+MOCK_LATENCY_SIGMA = 0.5
+MOCK_RATE_LIMIT_PROBABILITY = 0.02
+MOCK_MALFORMED_PROBABILITY = 0.01
+SEED = 7
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+SPEAKERS = ["Operator", "Jane Doe, Chief Executive Officer", "Richard Roe, Chief Financial Officer",
+            "Analyst, Example Securities"]
+GUIDANCE_SENTENCES = [
+    "Looking ahead to {next_year}, we expect revenue growth of {a}% to {b}%.",
+    "We are targeting a gross margin of approximately {a}% next year.",
+    "Capital expenditures are expected to be about ${a}0 million in {next_year}.",
+    "Our guidance for earnings per share is ${a}.{b}0 for the full year {next_year}.",
+    "We plan to keep the current ratio around 1.{a} going forward.",
+]
+CHATTER_SENTENCES = [
+    "Thank you for joining us today.",
+    "Last quarter revenue was ${a}.{b} billion, up {a}% from the prior year.",
+    "We saw strong demand across all of our regions during the quarter.",
+    "Please go ahead with your question.",
+    "That is a great question and I appreciate you asking it.",
+    "Our teams executed well despite a challenging environment.",
+]
+
+
+def make_transcript(rng, year, target_chars):
+    """
+    Synthetic earnings call: speaker turns mixing historical chatter and guidance.
+    """
+    turns = []
+    length = 0
+    while length < target_chars:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            template = rng.choice(GUIDANCE_SENTENCES if rng.random() < 0.2 else CHATTER_SENTENCES)
+            sentences.append(template.format(a=rng.randint(1, 9), b=rng.randint(1, 9), next_year=year + 1))
+        turn = f"{rng.choice(SPEAKERS)}:\n{' '.join(sentences)}\n\n"
+        turns.append(turn)
+        length += len(turn)
+    return "".join(turns)
+
+
+def write_transcripts(directory, count, target_chars, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        year = rng.randint(2019, 2024)
+        filename = f"{year}-{rng.choice(MONTHS)}-{rng.randint(1, 28):02d}-TCK{i}.N-Earnings Call Transcript.txt"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as file:
+            file.write(make_transcript(rng, year, target_chars))
+
+
+def peak_memory_mb():
+    # Peak resident set size of this process so far
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(num_transcripts=NUM_TRANSCRIPTS, max_workers=MAX_WORKERS):
+    server = MockDeepSeekServer(
+        latency_distribution=MOCK_LATENCY_DISTRIBUTION,
+        latency_mean=MOCK_LATENCY_MEAN,
+        latency_sigma=MOCK_LATENCY_SIGMA,
+        rate_limit_probability=MOCK_RATE_LIMIT_PROBABILITY,
+        retry_after=0.5,
+        malformed_probability=MOCK_MALFORMED_PROBABILITY,
+        seed=SEED,
+    ).start()
+
+    # Everything stays local: no cache hits, no manifest skips, no network
+    financial_analysis.DEEPSEEK_API_URL = server.url
+    financial_analysis.RESPONSE_CACHE_ENABLED = False
+    financial_analysis.MANIFEST_ENABLED = False
+    financial_analysis.PARAGRAPH_DEDUP_ENABLED = False
+    financial_analysis.API_BACKOFF_BASE = 0.1
+    pipeline_metrics.METRICS_LOG_PATH = None
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            data_dir = os.path.join(workdir, "data_source")
+            os.makedirs(data_dir)
+            write_transcripts(data_dir, num_transcripts, TRANSCRIPT_CHARS, SEED)
+            extraction_csv = os.path.join(workdir, "financial_information.csv")
+            consolidated_csv = os.path.join(workdir, "consolidated_financial_information.csv")
+            print(f"Generated {num_transcripts} transcripts of ~{TRANSCRIPT_CHARS:,} characters")
+
+            # Effectively unlimited budget: measure the pipeline, not the limiter
+            rate_limiter = RateLimiter(1_000_000, 1_000_000_000)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                financial_analysis.process_all_transcripts(data_dir, extraction_csv,
+                                                           max_workers=max_workers,
+                                                           rate_limiter=rate_limiter)
+            extraction_time = time.perf_counter() - start
+            extraction_memory = peak_memory_mb()
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                consolidate_financial_data(extraction_csv, consolidated_csv)
+            consolidation_time = time.perf_counter() - start
+
+            stats = financial_analysis.get_deepseek_client().stats()
+            print(f"Extraction:    {extraction_time:.2f}s, {num_transcripts / extraction_time:.1f} files/sec "
+                  f"({max_workers} workers)")
+            print(f"Requests:      {stats['requests']} ({stats['retries']} retries, {stats['failures']} failures, "
+                  f"{server.counts['rate_limited']} rate limited, {server.counts['malformed']} malformed)")
+            print(f"Latency:       p50 {stats.get('latency_p50', 0) * 1000:.0f}ms, "
+                  f"p99 {stats.get('latency_p99', 0) * 1000:.0f}ms")
+            print(f"Consolidation: {consolidation_time:.2f}s")
+            print(f"Peak memory:   {extraction_memory:.0f} MB after extraction, "
+                  f"{peak_memory_mb():.0f} MB after consolidation")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    run_benchmark()
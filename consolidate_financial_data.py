@@ -1,90 +1,411 @@
 import pandas as pd
+import numpy as np
 import os
-from collections import defaultdict
+import io
+import csv
+import json
+import codecs
+import hashlib
 
-def consolidate_financial_data(input_file, output_file):
+from pipeline_metrics import FileRecord, timed, log_event
+
+# Columns identifying one company-date record
+KEY_COLUMNS = ['ticker', 'year', 'month', 'day', 'exchange']
+
+# Basic information taken from the first row of each company-date record
+BASIC_COLUMNS = ['year', 'month', 'day', 'ticker', 'exchange', 'filename']
+
+# Financial indicators, consolidated with "last non-empty value wins"
+FINANCIAL_FIELDS = [
+    'revenue_growth', 'capital_expenditure', 'earnings_per_share',
+    'gross_margin', 'operating_margin', 'net_margin', 'ebitda',
+    'return_on_equity', 'return_on_assets', 'debt_to_equity_ratio',
+    'current_ratio', 'quick_ratio', 'interest_coverage_ratio',
+    'price_to_earnings_ratio', 'dividend_yield'
+]
+
+# Encodings tried, in order, when reading the extraction CSV (latin1 accepts any bytes)
+CANDIDATE_ENCODINGS = ['utf-8', 'gbk', 'latin1']
+ENCODING_SAMPLE_BYTES = 1024 * 1024
+
+# Rows per chunk in streaming mode
+STREAMING_CHUNK_ROWS = 200_000
+
+# Bytes before the high-water mark hashed to detect a rewritten or truncated input in incremental mode
+INCREMENTAL_FINGERPRINT_BYTES = 64 * 1024
+
+
+def company_date_group_ids(df):
+    """
+    Number each (ticker, year, month, day, exchange) combination in order of first appearance.
+    """
+    
+    # Factorize each key column, then combine the codes into one integer per row (mixed radix)
+    combined = np.zeros(len(df), dtype=np.int64)
+    for column in KEY_COLUMNS:
+        codes, uniques = pd.factorize(df[column])
+        combined = combined * (len(uniques) + 1) + (codes + 1)
+    
+    group_ids, uniques = pd.factorize(combined)
+    return group_ids, len(uniques)
+
+
+def consolidate_dataframe(df):
+    """
+    Collapse extracted statements into one row per (ticker, year, month, day, exchange).
+    
+    Basic information comes from the first row of each group and each financial
+    indicator takes the last non-empty value in the group. Groups keep the order
+    in which they first appear, and indicators that are empty everywhere are dropped.
+    """
+    
+    group_ids, num_groups = company_date_group_ids(df)
+    
+    # Basic information from the first row of each group (group ids are numbered in that order)
+    first_rows = ~pd.Series(group_ids).duplicated().to_numpy()
+    basic = df.loc[first_rows, BASIC_COLUMNS].astype(object)
+    consolidated = {col: basic[col].where(basic[col].notna(), '').to_numpy() for col in BASIC_COLUMNS}
+    
+    # Last non-empty value of each financial indicator
+    for field in FINANCIAL_FIELDS:
+        if field not in df.columns:
+            continue
+        column = df[field]
+        filled = (column.notna() & (column != '')).to_numpy()
+        if not filled.any():
+            continue
+        
+        filled_groups = group_ids[filled]
+        last_in_group = ~pd.Series(filled_groups).duplicated(keep='last').to_numpy()
+        
+        values = np.full(num_groups, np.nan, dtype=object)
+        values[filled_groups[last_in_group]] = column.to_numpy()[filled][last_in_group]
+        consolidated[field] = values
+    
+    # Columns are already ordered: basic information first, financial indicators last
+    return pd.DataFrame(consolidated).infer_objects()
+
+
+def detect_encoding(input_file, sample_bytes=ENCODING_SAMPLE_BYTES):
+    """
+    Pick the first candidate encoding that decodes a sample from the start of the file.
+    """
+    with open(input_file, 'rb') as file:
+        sample = file.read(sample_bytes)
+    
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            # Incremental decoder tolerates a multi-byte character cut off at the end of the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return CANDIDATE_ENCODINGS[-1]
+
+
+class CompanyAccumulator:
+    """
+    Running consolidation state with one record per (ticker, year, month, day, exchange).
+    
+    Chunks are folded in file order with the same rules as consolidate_dataframe,
+    so memory grows with the number of company-date records, not with the number of rows.
+    """
+    
+    def __init__(self):
+        self.records = {}
+        self.tickers = set()
+        self.rows_seen = 0
+    
+    def fold(self, chunk):
+        self.rows_seen += len(chunk)
+        self.tickers.update(chunk['ticker'].dropna().unique())
+        
+        # Consolidate the chunk vectorized first, then merge its (far fewer) records
+        for record in consolidate_dataframe(chunk).to_dict('records'):
+            key = tuple(str(record[col]) for col in KEY_COLUMNS)
+            existing = self.records.get(key)
+            if existing is None:
+                self.records[key] = {field: value for field, value in record.items()
+                                     if field in BASIC_COLUMNS or pd.notna(value)}
+                continue
+            
+            for field in FINANCIAL_FIELDS:
+                value = record.get(field)
+                if value is not None and pd.notna(value):
+                    existing[field] = value
+    
+    def load(self, consolidated_df):
+        """
+        Start from a previously consolidated table (one row per company-date record),
+        read as text so that missing values are the only non-string cells.
+        
+        Missing basic cells are keyed and stored as "", the way fold (through
+        consolidate_dataframe) keys them, so a record with an empty key cell is
+        merged with its new rows instead of duplicated.
+        
+        >>> accumulator = CompanyAccumulator()
+        >>> rows = {'ticker': ['AAPL'], 'year': ['2024'], 'month': ['1'], 'day': ['25'],
+        ...         'exchange': [''], 'filename': ['a.txt'], 'revenue_growth': ['5%']}
+        >>> accumulator.fold(pd.DataFrame(rows))
+        >>> saved = accumulator.to_dataframe().to_csv(index=False)
+        >>> accumulator = CompanyAccumulator()
+        >>> accumulator.load(pd.read_csv(io.StringIO(saved), dtype=str))
+        >>> accumulator.fold(pd.DataFrame(dict(rows, revenue_growth=['6%'])))
+        >>> accumulator.to_dataframe()[['ticker', 'exchange', 'revenue_growth']].values.tolist()
+        [['AAPL', '', '6%']]
+        """
+        self.tickers.update(consolidated_df['ticker'].dropna().unique())
+        columns = list(consolidated_df.columns)
+        basic = [col in BASIC_COLUMNS for col in columns]
+        key_positions = [columns.index(col) for col in KEY_COLUMNS]
+        for row in consolidated_df.astype(object).to_numpy().tolist():
+            row = [value if isinstance(value, str) or not is_basic else ''
+                   for value, is_basic in zip(row, basic)]
+            key = tuple(row[i] for i in key_positions)
+            self.records[key] = {field: value for field, value, is_basic in zip(columns, row, basic)
+                                 if is_basic or isinstance(value, str)}
+    
+    def to_dataframe(self):
+        consolidated_df = pd.DataFrame(list(self.records.values()))
+        existing_columns = [col for col in BASIC_COLUMNS + FINANCIAL_FIELDS if col in consolidated_df.columns]
+        return consolidated_df[existing_columns]
+
+
+def consolidate_financial_data_streaming(input_file, output_file, chunksize=STREAMING_CHUNK_ROWS):
+    """
+    Out-of-core variant of consolidate_financial_data for inputs larger than memory.
+    
+    The encoding is detected once from a sample, the CSV is read in chunks of
+    `chunksize` rows, and each chunk is folded into a CompanyAccumulator. All
+    columns are read as text so keys match across chunks; values are written
+    exactly as they appear in the input. Bytes beyond the sample that the
+    detected encoding cannot decode are replaced rather than aborting the
+    stream part-way through.
+    """
     
     # Check if input file exists
     if not os.path.exists(input_file):
         print(f"Error: Cannot find input file {input_file}")
         return
     
-    # Read CSV file, handling encoding issues
+    encoding = detect_encoding(input_file)
+    print(f"Streaming {input_file} ({encoding}) in chunks of {chunksize:,} rows")
+    
+    record = FileRecord()
+    accumulator = CompanyAccumulator()
+    with record.active():
+        chunks = pd.read_csv(input_file, encoding=encoding, encoding_errors='replace', dtype=str, chunksize=chunksize)
+        while True:
+            with timed("consolidate_read"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            with timed("consolidate_group"):
+                accumulator.fold(chunk)
+        
+        with timed("consolidate_write"):
+            consolidated_df = accumulator.to_dataframe()
+            consolidated_df.to_csv(output_file, index=False, encoding='utf-8')
+    
+    log_event("consolidate", input_file=input_file, output_file=output_file,
+              rows_in=accumulator.rows_seen, rows_out=len(consolidated_df), **record.as_dict())
+    
+    print(f"Number of unique companies: {len(accumulator.tickers)}")
+    print(f"Data saved to: {output_file}")
+    print(f"Records before consolidation: {accumulator.rows_seen}")
+    print(f"Records after consolidation: {len(consolidated_df)}")
+
+
+class _FileRange(io.RawIOBase):
+    # Read-only view of bytes [start, end) of an open binary file
+    
+    def __init__(self, file, start, end):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = end - start
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        read = self.file.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+
+def consolidation_state_path_for(output_file):
+    """
+    High-water mark location: consolidated_financial_information.csv -> consolidated_financial_information.state.json
+    """
+    return f"{os.path.splitext(output_file)[0]}.state.json"
+
+
+def _input_fingerprint(input_file, offset):
+    # Hash of the header line and the bytes just before the high-water mark
+    digest = hashlib.sha256()
+    with open(input_file, 'rb') as file:
+        digest.update(file.readline())
+        file.seek(max(0, offset - INCREMENTAL_FINGERPRINT_BYTES))
+        digest.update(file.read(offset - file.tell()))
+    return digest.hexdigest()
+
+
+def _complete_rows_end(input_file, size):
+    # Offset just past the last newline, so a row still being appended is left for the next run
+    with open(input_file, 'rb') as file:
+        position = size
+        while position > 0:
+            start = max(0, position - 65536)
+            file.seek(start)
+            block = file.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def _output_signature(output_file):
+    stat = os.stat(output_file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_state(input_file, output_file, state_file):
+    # Previous high-water mark, or None if missing or no longer valid for these files
     try:
-        df = pd.read_csv(input_file, encoding='utf-8')
-    except UnicodeDecodeError:
+        with open(state_file, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+        if state['input_file'] != os.path.abspath(input_file):
+            return None
+        if state['offset'] > os.path.getsize(input_file):
+            return None
+        if _input_fingerprint(input_file, state['offset']) != state['input_fingerprint']:
+            return None
+        if _output_signature(output_file) != state['output_signature']:
+            return None
+        return state
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def consolidate_financial_data_incremental(input_file, output_file, chunksize=STREAMING_CHUNK_ROWS):
+    """
+    Fold only the extraction rows appended since the previous run into the consolidated table.
+    
+    The table is kept in output_file, keyed by (ticker, year, month, day, exchange),
+    and the byte offset of the input rows already folded in is kept next to it
+    (consolidation_state_path_for). Each run loads the table, reads the input
+    from that offset, merges the new rows with the same rules as
+    consolidate_financial_data_streaming and moves the offset forward, so its
+    cost grows with the new rows and the number of records, not with the whole
+    history. If the input was truncated or rewritten, or the output was changed
+    by another tool, the table is rebuilt from the start of the input.
+    """
+    
+    # Check if input file exists
+    if not os.path.exists(input_file):
+        print(f"Error: Cannot find input file {input_file}")
+        return
+    
+    state_file = consolidation_state_path_for(output_file)
+    state = _load_state(input_file, output_file, state_file)
+    
+    record = FileRecord()
+    accumulator = CompanyAccumulator()
+    with record.active():
+        if state is not None:
+            encoding = state['encoding']
+            offset = state['offset']
+            with timed("consolidate_read"):
+                accumulator.load(pd.read_csv(output_file, encoding='utf-8', dtype=str))
+            accumulator.rows_seen = state['rows']
+        else:
+            if os.path.exists(state_file):
+                print(f"{input_file} or {output_file} changed since the last run; rebuilding")
+            encoding = detect_encoding(input_file)
+            offset = 0
+        
+        end = _complete_rows_end(input_file, os.path.getsize(input_file))
+        with open(input_file, 'rb') as file:
+            header = file.readline()
+            columns = next(csv.reader([header.decode(encoding, errors='replace').lstrip('\ufeff')]))
+            start = max(offset, len(header))
+            rows_before = accumulator.rows_seen
+            if end > start:
+                stream = io.TextIOWrapper(io.BufferedReader(_FileRange(file, start, end)), encoding=encoding,
+                                          errors='replace', newline='')
+                chunks = pd.read_csv(stream, header=None, names=columns, dtype=str, chunksize=chunksize)
+                while True:
+                    with timed("consolidate_read"):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    with timed("consolidate_group"):
+                        accumulator.fold(chunk)
+        new_rows = accumulator.rows_seen - rows_before
+        
+        with timed("consolidate_write"):
+            consolidated_df = accumulator.to_dataframe()
+            # Written to a temporary file first so an interrupted run leaves the previous table intact
+            consolidated_df.to_csv(f"{output_file}.tmp", index=False, encoding='utf-8')
+            os.replace(f"{output_file}.tmp", output_file)
+            state = {
+                'input_file': os.path.abspath(input_file),
+                'encoding': encoding,
+                'offset': max(end, len(header)),
+                'rows': accumulator.rows_seen,
+                'input_fingerprint': _input_fingerprint(input_file, max(end, len(header))),
+                'output_signature': _output_signature(output_file),
+            }
+            with open(f"{state_file}.tmp", 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(f"{state_file}.tmp", state_file)
+    
+    log_event("consolidate", input_file=input_file, output_file=output_file, incremental=True,
+              rows_in=new_rows, rows_out=len(consolidated_df), **record.as_dict())
+    
+    print(f"New records folded in: {new_rows} (from byte {offset:,})")
+    print(f"Number of unique companies: {len(accumulator.tickers)}")
+    print(f"Data saved to: {output_file}")
+    print(f"Records before consolidation: {accumulator.rows_seen}")
+    print(f"Records after consolidation: {len(consolidated_df)}")
+
+
+def consolidate_financial_data(input_file, output_file):
+    
+    # Check if input file exists
+    if not os.path.exists(input_file):
+        print(f"Error: Cannot find input file {input_file}")
+        return
+    
+    record = FileRecord()
+    
+    # Read CSV file with the encoding detected from a sample, so the file is read only once
+    with record.active(), timed("consolidate_read"):
         try:
-            df = pd.read_csv(input_file, encoding='gbk')
+            df = pd.read_csv(input_file, encoding=detect_encoding(input_file))
         except UnicodeDecodeError:
+            # Undecodable bytes beyond the sample
             df = pd.read_csv(input_file, encoding='latin1')
     
     # Display basic information
     print(f"Original data shape: {df.shape}")
     print(f"Number of unique companies: {df['ticker'].nunique()}")
     
-    # Create a dictionary to store records for each company-date combination
-    consolidated_data = defaultdict(dict)
-    
-    # Iterate through each row of data
-    for index, row in df.iterrows():
-        # Create a unique key (based on company identifier and date)
-        company_key = (
-            str(row['ticker']) if pd.notna(row['ticker']) else '',
-            str(row['year']) if pd.notna(row['year']) else '',
-            str(row['month']) if pd.notna(row['month']) else '',
-            str(row['day']) if pd.notna(row['day']) else '',
-            str(row['exchange']) if pd.notna(row['exchange']) else ''
-        )
-        
-        # If this key doesn't exist, initialize basic information
-        if company_key not in consolidated_data:
-            consolidated_data[company_key] = {
-                'year': row['year'] if pd.notna(row['year']) else '',
-                'month': row['month'] if pd.notna(row['month']) else '',
-                'day': row['day'] if pd.notna(row['day']) else '',
-                'ticker': row['ticker'] if pd.notna(row['ticker']) else '',
-                'exchange': row['exchange'] if pd.notna(row['exchange']) else '',
-                'filename': row['filename'] if pd.notna(row['filename']) else ''
-            }
-        
-        # Get the financial category of the current row
-        category = row['financial_category']
-        
-        # Add the financial indicator values of this row to the corresponding company-date record
-        financial_fields = [
-            'revenue_growth', 'capital_expenditure', 'earnings_per_share',
-            'gross_margin', 'operating_margin', 'net_margin', 'ebitda',
-            'return_on_equity', 'return_on_assets', 'debt_to_equity_ratio',
-            'current_ratio', 'quick_ratio', 'interest_coverage_ratio',
-            'price_to_earnings_ratio', 'dividend_yield'
-        ]
+    with record.active():
+        # Group by company and date in a single vectorized pass
+        with timed("consolidate_group"):
+            consolidated_df = consolidate_dataframe(df)
         
-        for field in financial_fields:
-            if pd.notna(row[field]) and row[field] != '':
-                consolidated_data[company_key][field] = row[field]
+        # Save to new CSV file
+        with timed("consolidate_write"):
+            consolidated_df.to_csv(output_file, index=False, encoding='utf-8')
     
-    # Convert dictionary to list
-    consolidated_list = list(consolidated_data.values())
-    
-    # Create a new DataFrame
-    consolidated_df = pd.DataFrame(consolidated_list)
-    
-    # Reorder columns to put basic information first and financial indicators last
-    column_order = [
-        'year', 'month', 'day', 'ticker', 'exchange', 'filename',
-        'revenue_growth', 'capital_expenditure', 'earnings_per_share',
-        'gross_margin', 'operating_margin', 'net_margin', 'ebitda',
-        'return_on_equity', 'return_on_assets', 'debt_to_equity_ratio',
-        'current_ratio', 'quick_ratio', 'interest_coverage_ratio',
-        'price_to_earnings_ratio', 'dividend_yield'
-    ]
-    
-    # Keep only existing columns
-    existing_columns = [col for col in column_order if col in consolidated_df.columns]
-    consolidated_df = consolidated_df[existing_columns]
-    
-    # Save to new CSV file
-    consolidated_df.to_csv(output_file, index=False, encoding='utf-8')
+    log_event("consolidate", input_file=input_file, output_file=output_file,
+              rows_in=len(df), rows_out=len(consolidated_df), **record.as_dict())
     
     print(f"Consolidated data shape: {consolidated_df.shape}")
     print(f"Data saved to: {output_file}")
@@ -96,5 +417,16 @@ if __name__ == "__main__":
     input_csv = r"financial_information.csv"
     output_csv = r"consolidated_financial_information.csv"
     
+    # Stream the input in chunks when it does not fit in memory
+    streaming = False
+    
+    # Only merge rows appended since the previous run (also streams the input)
+    incremental = False
+    
     # Execute data consolidation
-    consolidate_financial_data(input_csv, output_csv)
\ No newline at end of file
+    if incremental:
+        consolidate_financial_data_incremental(input_csv, output_csv)
+    elif streaming:
+        consolidate_financial_data_streaming(input_csv, output_csv)
+    else:
+        consolidate_financial_data(input_csv, output_csv)
\ No newline at end of file
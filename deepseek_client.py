@@ -0,0 +1,207 @@
+import json
+import time
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import RateLimiter
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DeepSeekAPIError(Exception):
+    """
+    Raised when a request still fails after all retries.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_stream_content(response: requests.Response) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Yield (content delta, finish_reason, usage) from a streamed chat completion (server-sent events).
+    usage is only set on the final chunk, when the request asked for it with stream_options.
+    """
+    # Event streams are UTF-8; requests would fall back to ISO-8859-1 without a charset
+    for raw_line in response.iter_lines():
+        line = raw_line.decode("utf-8", errors="replace")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        usage = event.get("usage")
+        choices = event.get("choices") or []
+        if not choices and usage:
+            yield "", None, usage
+        for choice in choices:
+            delta = (choice.get("delta") or {}).get("content") or ""
+            yield delta, choice.get("finish_reason"), usage
+
+
+class DeepSeekClient:
+    """
+    Reusable DeepSeek chat completions client.
+
+    Keeps a pooled keep-alive session so workers reuse TCP+TLS connections,
+    retries rate-limited and transient failures with exponential backoff and
+    full jitter (honoring Retry-After), and records latency and retry statistics.
+
+    Args:
+        api_key (str): DeepSeek API key
+        api_url (str): Chat completions endpoint
+        pool_size (int): Maximum pooled connections, normally the number of concurrent requests
+        max_retries (int): Retries after the first attempt
+        backoff_base (float): First backoff in seconds, doubled on each retry
+        backoff_max (float): Upper bound on a single backoff
+        connect_timeout (float): Seconds to establish a connection
+        read_timeout (float): Seconds to wait for the response
+    """
+
+    def __init__(self, api_key: str, api_url: str, pool_size: int = 16, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 connect_timeout: float = 10.0, read_timeout: float = 120.0):
+        self.api_url = api_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=10000)
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+        self._status_counts: Dict[str, int] = {}
+
+    def _record(self, status: str, latency: Optional[float] = None):
+        with self._lock:
+            self._requests += 1
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def post(self, payload: Dict[str, Any], rate_limiter: Optional[RateLimiter] = None,
+             tokens: int = 0, stream: bool = False) -> requests.Response:
+        """
+        POST a chat completions payload, retrying until success or retries run out.
+
+        Args:
+            payload (dict): Request body
+            rate_limiter (RateLimiter): Optional limiter acquired before every attempt
+            tokens (int): Estimated tokens reserved from the limiter per attempt
+            stream (bool): Return as soon as headers arrive and leave the body to be
+                streamed; only failures before the body starts are retried
+
+        Returns:
+            requests.Response: Successful response, with the number of retries it took
+                as its `retries` attribute
+
+        Raises:
+            DeepSeekAPIError: If the last attempt still failed
+        """
+        last_error = ""
+        last_status = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                with self._lock:
+                    self._retries += 1
+
+            if rate_limiter is not None:
+                rate_limiter.acquire(tokens)
+
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(type(e).__name__)
+                last_error, last_status = str(e), None
+            else:
+                latency = time.perf_counter() - start
+                self._record(str(response.status_code), latency)
+                if response.status_code < 400:
+                    response.retries = attempt
+                    return response
+
+                last_error, last_status = f"HTTP {response.status_code}: {response.text[:200]}", response.status_code
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                print(f"API request failed ({last_error}); retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 2}/{self.max_retries + 1})")
+                time.sleep(delay)
+
+        with self._lock:
+            self._failures += 1
+        raise DeepSeekAPIError(last_error, last_status)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Request counts, retries, failures, status code counts and latency percentiles (seconds).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "status_counts": dict(self._status_counts),
+            }
+
+        if latencies:
+            stats["latency_p50"] = latencies[len(latencies) // 2]
+            stats["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats["latency_p99"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            stats["latency_max"] = latencies[-1]
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,510 @@
+import os
+import csv
+import json
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Set
+
+import financial_analysis
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from transcript_watcher import scan_transcripts
+from results_store import ResultsStore, results_store_path_for
+from run_manifest import RunManifest
+from pipeline_metrics import FileRecord, log_file, log_event
+
+# Lease configuration; hosts' clocks must agree to well within LEASE_SECONDS (e.g. NTP)
+LEASE_SECONDS = 600.0           # A lease not renewed for this long belongs to a crashed worker and may be taken over
+HEARTBEAT_SECONDS = 30.0        # Renewal interval of the leases a worker holds
+CLAIM_POLL_SECONDS = 5.0        # Wait between passes while other workers still hold the remaining files
+
+
+def work_dir_for(output_csv_path: str) -> str:
+    """
+    Shared state location for an output CSV: financial_information.csv -> financial_information.distributed/
+    """
+    return f"{os.path.splitext(output_csv_path)[0]}.distributed"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+class LeaseManager:
+    """
+    Work claiming between hosts through lease files on a shared filesystem.
+
+    A worker claims a transcript by creating its lease file exclusively
+    (O_CREAT | O_EXCL, atomic on local filesystems and NFSv3+), and renews
+    it every `heartbeat_seconds` by touching it. A lease whose mtime is older
+    than `lease_seconds` is left by a crashed worker: it is renamed aside and
+    claimed afresh. Two workers may both see the same expired lease; the
+    second rename then moves the first worker's new lease, which is detected
+    from its token and mtime and put back, so only one of them claims the
+    file. Each lease holds
+    a random token, checked before results are committed, so a worker whose
+    lease was taken over discards its work instead of committing it twice.
+
+    A finished transcript gets a done marker with its size and mtime and the
+    byte range of its rows in the worker's shard; it is not claimed again
+    unless the transcript changes.
+
+    Args:
+        work_dir (str): Shared directory for leases, done markers and shards
+        directory_path (str): Transcript directory; files are keyed by their path relative
+            to it, so hosts may mount the share at different paths
+        worker_id (str): Unique name of this worker
+        lease_seconds (float): Lease expiry without renewal
+        heartbeat_seconds (float): Lease renewal interval
+    """
+
+    def __init__(self, work_dir: str, directory_path: str, worker_id: str,
+                 lease_seconds: float = LEASE_SECONDS, heartbeat_seconds: float = HEARTBEAT_SECONDS):
+        self.directory_path = directory_path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lease_dir = os.path.join(work_dir, "leases")
+        self.done_dir = os.path.join(work_dir, "done")
+        for directory in (self.lease_dir, self.done_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        # path -> token of the leases held by this worker
+        self.held: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = None
+
+    def _key(self, file_path: str) -> str:
+        relative = os.path.relpath(file_path, self.directory_path).replace(os.sep, "/")
+        return hashlib.sha256(relative.encode("utf-8")).hexdigest()
+
+    def _lease_path(self, file_path: str) -> str:
+        return os.path.join(self.lease_dir, f"{self._key(file_path)}.lease")
+
+    def _done_path(self, file_path: str) -> str:
+        return os.path.join(self.done_dir, f"{self._key(file_path)}.json")
+
+    def is_done(self, file_path: str, stat: os.stat_result) -> bool:
+        marker = _read_json(self._done_path(file_path))
+        return marker is not None and marker["size"] == stat.st_size and marker["mtime"] == stat.st_mtime
+
+    def claim(self, file_path: str) -> bool:
+        """
+        Try to take the lease on a file; False if another worker holds a live lease.
+        """
+        lease_path = self._lease_path(file_path)
+        token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._take_over_expired(lease_path, token):
+                    return False
+                continue
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump({"worker": self.worker_id, "token": token,
+                           "file": os.path.relpath(file_path, self.directory_path)}, file)
+            with self._lock:
+                self.held[file_path] = token
+            return True
+        return False
+
+    def _take_over_expired(self, lease_path: str, token: str) -> bool:
+        """
+        Remove an expired lease so it can be claimed; False if the lease is live.
+        """
+        try:
+            if time.time() - os.stat(lease_path).st_mtime < self.lease_seconds:
+                return False
+        except FileNotFoundError:
+            # Released or taken over meanwhile: try to create it
+            return True
+        expired = _read_json(lease_path)
+
+        aside_path = f"{lease_path}.{token}.expired"
+        try:
+            os.rename(lease_path, aside_path)
+        except FileNotFoundError:
+            # Another worker moved it first
+            return True
+
+        # Between our check and the rename another worker may have taken the expired
+        # lease over and created a fresh one; the rename then moved that one
+        moved = _read_json(aside_path)
+        try:
+            fresh = time.time() - os.stat(aside_path).st_mtime < self.lease_seconds
+        except FileNotFoundError:
+            fresh = False
+        if fresh or (moved is not None and moved != expired):
+            try:
+                # Put it back unless yet another lease was created meanwhile (link never replaces)
+                os.link(aside_path, lease_path)
+            except FileExistsError:
+                pass
+            except OSError:
+                # Filesystem without hard links
+                if not os.path.exists(lease_path):
+                    os.rename(aside_path, lease_path)
+            self._remove(aside_path)
+            return False
+
+        self._remove(aside_path)
+        return True
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def owns(self, file_path: str) -> bool:
+        """
+        True if this worker still holds the lease (it was not taken over after expiring).
+        """
+        with self._lock:
+            token = self.held.get(file_path)
+        lease = _read_json(self._lease_path(file_path))
+        return token is not None and lease is not None and lease.get("token") == token
+
+    def release(self, file_path: str):
+        with self._lock:
+            token = self.held.pop(file_path, None)
+        # A live lease cannot be taken over, so one still holding our token is ours to remove
+        lease_path = self._lease_path(file_path)
+        lease = _read_json(lease_path)
+        if token is not None and lease is not None and lease.get("token") == token:
+            try:
+                os.remove(lease_path)
+            except OSError:
+                pass
+
+    def mark_done(self, file_path: str, stat: os.stat_result, shard: str, start: int, end: int, statements: int):
+        _write_json_atomic(self._done_path(file_path), {
+            "file": os.path.relpath(file_path, self.directory_path).replace(os.sep, "/"),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "shard": shard,
+            "start": start,
+            "end": end,
+            "statements": statements,
+            "worker": self.worker_id,
+            "finished_at": time.time(),
+        })
+
+    def _renew(self):
+        while not self._stopped.wait(self.heartbeat_seconds):
+            with self._lock:
+                held = list(self.held)
+            for file_path in held:
+                try:
+                    os.utime(self._lease_path(file_path))
+                except OSError:
+                    # Taken over after expiring; owns() reports it at commit time
+                    pass
+
+    def start_heartbeat(self):
+        self._heartbeat = threading.Thread(target=self._renew, daemon=True)
+        self._heartbeat.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        with self._lock:
+            held = list(self.held)
+        for file_path in held:
+            self.release(file_path)
+
+
+def read_done_markers(work_dir: str) -> List[Dict[str, Any]]:
+    """
+    Done markers of every transcript finished by any worker.
+    """
+    markers = []
+    done_dir = os.path.join(work_dir, "done")
+    if not os.path.isdir(done_dir):
+        return markers
+    for entry in os.scandir(done_dir):
+        if entry.name.endswith(".json"):
+            marker = _read_json(entry.path)
+            if marker is not None:
+                markers.append(marker)
+    return markers
+
+
+def run_extraction_worker(directory_path: str, output_csv_path: str, worker_id: Optional[str] = None,
+                          max_workers: Optional[int] = None, rate_limiter: Optional[RateLimiter] = None,
+                          cache: Optional[ResponseCache] = None):
+    """
+    Extract transcripts as one of several workers sharing directory_path.
+
+    Run this on every host against the same shared transcript directory and
+    output path. Each worker claims files one at a time through LeaseManager,
+    extracts up to `max_workers` in parallel and appends the rows to its own
+    shard (shards/<worker_id>.csv in the work directory), so workers never
+    write to the same file. The worker returns once every transcript has a
+    done marker or could not be extracted by it; merge_shards() then builds
+    the output CSV.
+
+    The rate limit applies per worker: set REQUESTS_PER_MINUTE and
+    TOKENS_PER_MINUTE to the account budget divided by the number of hosts.
+    The response cache and paragraph index are SQLite files and should be on
+    local disk, not the shared filesystem.
+    """
+    if not os.path.isdir(directory_path):
+        print(f"Directory not found: {directory_path}")
+        return
+
+    worker_id = worker_id or default_worker_id()
+    work_dir = work_dir_for(output_csv_path)
+    shard_dir = os.path.join(work_dir, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    shard = f"{worker_id}.csv"
+    shard_path = os.path.join(shard_dir, shard)
+    # Header first, so every recorded byte range holds rows only
+    financial_analysis.write_rows_to_csv([], shard_path)
+
+    if max_workers is None:
+        max_workers = financial_analysis.MAX_WORKERS
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(financial_analysis.REQUESTS_PER_MINUTE, financial_analysis.TOKENS_PER_MINUTE)
+    if cache is None:
+        cache = financial_analysis.open_response_cache()
+
+    leases = LeaseManager(work_dir, directory_path, worker_id)
+    leases.start_heartbeat()
+    failed: Set[str] = set()
+    extracted = statements = 0
+    start_time = time.time()
+    print(f"Worker {worker_id} extracting {directory_path} into {shard_path}")
+
+    def extract(file_path: str):
+        record = FileRecord()
+        with record.active():
+            try:
+                return financial_analysis.extract_transcript_rows(file_path, rate_limiter, cache), record, None
+            except Exception as e:
+                return [], record, e
+
+    def commit(future):
+        # Runs on this thread only, so the shard has a single writer
+        nonlocal extracted, statements
+        file_path, stat = running.pop(future)
+        rows, record, error = future.result()
+        filename = os.path.basename(file_path)
+        if error is None and not leases.owns(file_path):
+            error = RuntimeError("lease expired and was taken over by another worker")
+        if error is not None:
+            failed.add(file_path)
+            leases.release(file_path)
+            log_file(file_path, record, "failed", 0, error=str(error))
+            print(f"Error processing {filename}: {error}")
+            return
+
+        with record.active():
+            offset = os.path.getsize(shard_path)
+            financial_analysis.write_rows_to_csv(rows, shard_path)
+            leases.mark_done(file_path, stat, shard, offset, os.path.getsize(shard_path), len(rows))
+        leases.release(file_path)
+        done[file_path] = (stat.st_size, stat.st_mtime)
+        extracted += 1
+        statements += len(rows)
+        log_file(file_path, record, "done", len(rows))
+        print(f"Completed {filename}: Extracted {len(rows)} statements")
+
+    def is_done(file_path: str, stat: os.stat_result) -> bool:
+        # Done markers are only read until a file is known to be done
+        if done.get(file_path) == (stat.st_size, stat.st_mtime):
+            return True
+        if leases.is_done(file_path, stat):
+            done[file_path] = (stat.st_size, stat.st_mtime)
+            return True
+        return False
+
+    running = {}
+    done: Dict[str, tuple] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            while True:
+                pending = [(file_path, stat) for file_path, stat in sorted(scan_transcripts(directory_path))
+                           if file_path not in failed and not is_done(file_path, stat)]
+                claimed = held_elsewhere = 0
+                for file_path, stat in pending:
+                    while len(running) >= max_workers:
+                        finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            commit(future)
+                    # Claimed one at a time, just before extraction, so hosts share the work evenly
+                    if not leases.claim(file_path):
+                        held_elsewhere += 1
+                        continue
+                    # Checked again under the lease: another worker may have just finished it
+                    if is_done(file_path, stat):
+                        leases.release(file_path)
+                        continue
+                    running[executor.submit(extract, file_path)] = (file_path, stat)
+                    claimed += 1
+
+                for future in list(running):
+                    future.result()
+                    commit(future)
+
+                if not claimed:
+                    if not held_elsewhere:
+                        break
+                    # The rest is held by other workers; rescan in case one crashes and its lease expires
+                    time.sleep(min(CLAIM_POLL_SECONDS, leases.lease_seconds))
+    finally:
+        leases.stop()
+
+    elapsed = time.time() - start_time
+    print(f"Worker {worker_id}: extracted {statements} statements from {extracted} files in {elapsed:.1f}s"
+          f"{f', {len(failed)} failed' if failed else ''}")
+    log_event("worker", worker=worker_id, directory=directory_path, files=extracted, failed=len(failed),
+              statements=statements, elapsed_seconds=round(elapsed, 2))
+
+
+def merge_shards(output_csv_path: str, directory_path: Optional[str] = None) -> int:
+    """
+    Build the output CSV from the workers' shards.
+
+    Only the rows recorded in a done marker are copied, so rows of a file
+    re-extracted after its lease was taken over, or left behind by a crashed
+    worker, are never duplicated. Files are written in the order they
+    finished, so rows extracted since the last merge land at the end of the
+    CSV (which incremental consolidation relies on). Rows already in the CSV
+    for files without a done marker, such as those of earlier single-host
+    runs, are kept ahead of them; rows of files with a marker are replaced by
+    the shard's rows. With RESULTS_STORE_ENABLED the results store is rebuilt
+    from the merged CSV, so the web interface serves the distributed results.
+
+    With MANIFEST_ENABLED the merge holds the manifest's writer lock, and
+    given the transcript directory, every merged transcript that is unchanged
+    since its extraction is recorded as done in the manifest, so a later
+    single-host run does not extract it again.
+
+    Args:
+        output_csv_path (str): Output CSV the workers were started with
+        directory_path (str): Transcript directory the workers were started with
+
+    Returns:
+        int: Number of transcripts merged
+    """
+    work_dir = work_dir_for(output_csv_path)
+    markers = read_done_markers(work_dir)
+    markers.sort(key=lambda marker: (marker["finished_at"], marker["file"]))
+
+    manifest = None
+    if financial_analysis.MANIFEST_ENABLED:
+        manifest = RunManifest(financial_analysis.manifest_path_for(output_csv_path))
+    try:
+        if manifest is None:
+            kept = _merge_into(output_csv_path, work_dir, markers)
+        else:
+            with manifest.writing(output_csv_path):
+                kept = _merge_into(output_csv_path, work_dir, markers)
+                if directory_path is not None:
+                    _record_merged(manifest, directory_path, markers)
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+    print(f"Merged {len(markers)} transcripts ({sum(m['statements'] for m in markers)} statements) "
+          f"from {len({m['shard'] for m in markers})} shards into {output_csv_path}"
+          f"{f', keeping {kept} rows of other transcripts' if kept else ''}")
+
+    if financial_analysis.RESULTS_STORE_ENABLED:
+        store = ResultsStore(results_store_path_for(output_csv_path))
+        try:
+            rows = store.rebuild_from_csv(output_csv_path)
+        finally:
+            store.close()
+        print(f"Rebuilt {store.db_path} with {rows} rows")
+    return len(markers)
+
+
+def _merge_into(output_csv_path: str, work_dir: str, markers: List[Dict[str, Any]]) -> int:
+    # Existing rows of files without a marker first, then the marked shard ranges; returns rows kept
+    merged_names = {os.path.basename(marker["file"]) for marker in markers}
+    temp_path = f"{output_csv_path}.{uuid.uuid4().hex}.tmp"
+    kept = 0
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as output:
+            writer = csv.DictWriter(output, fieldnames=financial_analysis.CSV_FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            if os.path.exists(output_csv_path):
+                with open(output_csv_path, "r", newline="", encoding="utf-8", errors="replace") as existing:
+                    for row in csv.DictReader(existing):
+                        if row.get("filename") not in merged_names:
+                            writer.writerow(row)
+                            kept += 1
+
+        shards = {}
+        try:
+            with open(temp_path, "ab") as output:
+                for marker in markers:
+                    if marker["shard"] not in shards:
+                        shards[marker["shard"]] = open(os.path.join(work_dir, "shards", marker["shard"]), "rb")
+                    shard = shards[marker["shard"]]
+                    shard.seek(marker["start"])
+                    output.write(shard.read(marker["end"] - marker["start"]))
+        finally:
+            for shard in shards.values():
+                shard.close()
+        os.replace(temp_path, output_csv_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return kept
+
+
+def _record_merged(manifest: RunManifest, directory_path: str, markers: List[Dict[str, Any]]):
+    # A transcript changed since its worker extracted it is left for the next run
+    for marker in markers:
+        file_path = os.path.join(directory_path, *marker["file"].split("/"))
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        if stat.st_size == marker["size"] and stat.st_mtime == marker["mtime"]:
+            manifest.mark_processing(file_path)
+            manifest.mark_done(file_path, marker["statements"])
+
+
+if __name__ == "__main__":
+    # Same locations as financial_analysis.py, on a filesystem shared by all hosts
+    TRANSCRIPT_DIR = r"data_source"
+    OUTPUT_CSV = r"financial_information.csv"
+    CONSOLIDATED_CSV = r"consolidated_financial_information.csv"
+
+    # Run a worker on every host; when all have finished, run once with merge = True
+    merge = False
+
+    if merge:
+        from consolidate_financial_data import consolidate_financial_data
+        merge_shards(OUTPUT_CSV, TRANSCRIPT_DIR)
+        consolidate_financial_data(OUTPUT_CSV, CONSOLIDATED_CSV)
+    else:
+        run_extraction_worker(TRANSCRIPT_DIR, OUTPUT_CSV)
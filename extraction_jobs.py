@@ -0,0 +1,200 @@
+import os
+import time
+import queue
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import financial_analysis
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from run_manifest import RunManifest
+from results_store import ResultsStore
+from pipeline_metrics import FileRecord, log_file
+
+# Per-file and per-job status values
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"     # Already extracted and unchanged
+
+# Finished jobs kept for the status endpoints
+MAX_JOBS_KEPT = 200
+
+
+class ExtractionJobQueue:
+    """
+    Background extraction for the web app.
+
+    Each submitted job is a set of transcript files; every file runs as a task
+    on a shared worker pool under one rate limiter, and rows are appended to
+    the output CSV one file at a time under a write lock. Status changes are
+    published to subscribers (used for the server-sent-events stream).
+
+    Args:
+        output_csv_path (str): Extraction CSV the rows are appended to
+        max_workers (int): Number of transcripts extracted concurrently
+        rate_limiter (RateLimiter): Shared limiter; built from the financial_analysis settings if not given
+        cache (ResponseCache): Response cache; opened from the financial_analysis settings if not given
+        manifest (RunManifest): Processed-file manifest; opened next to the output CSV if not given
+            and MANIFEST_ENABLED is set
+        store (ResultsStore): Results store; opened next to the output CSV if not given and
+            RESULTS_STORE_ENABLED is set
+    """
+
+    def __init__(self, output_csv_path: str, max_workers: int = financial_analysis.MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                 manifest: Optional[RunManifest] = None, store: Optional[ResultsStore] = None):
+        self.output_csv_path = output_csv_path
+        self.rate_limiter = rate_limiter or RateLimiter(financial_analysis.REQUESTS_PER_MINUTE,
+                                                        financial_analysis.TOKENS_PER_MINUTE)
+        self.cache = cache if cache is not None else financial_analysis.open_response_cache()
+
+        if manifest is None and financial_analysis.MANIFEST_ENABLED:
+            manifest = RunManifest(financial_analysis.manifest_path_for(output_csv_path))
+        self.manifest = manifest
+        if self.manifest is not None:
+            self.manifest.recover(output_csv_path)
+        self.store = store if store is not None else financial_analysis.open_results_store(output_csv_path)
+
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="extract")
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+
+    # Event subscription
+
+    def subscribe(self) -> queue.Queue:
+        events = queue.Queue(maxsize=1000)
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue):
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def _publish(self, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                # A stalled client must not block the workers
+                pass
+
+    # Job bookkeeping
+
+    def _job_summary(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        counts = {}
+        for entry in job["files"].values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        finished = sum(counts.get(s, 0) for s in (STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED))
+
+        if finished < len(job["files"]):
+            status = STATUS_RUNNING if finished or counts.get(STATUS_RUNNING) else STATUS_QUEUED
+        else:
+            status = STATUS_FAILED if counts.get(STATUS_FAILED) else STATUS_DONE
+
+        return {
+            "job_id": job["job_id"],
+            "status": status,
+            "created_at": job["created_at"],
+            "total": len(job["files"]),
+            "finished": finished,
+            "statements": sum(entry["statements"] for entry in job["files"].values()),
+            "counts": counts,
+        }
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = self._job_summary(job)
+            snapshot["files"] = [dict(entry) for entry in job["files"].values()]
+        return snapshot
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._job_summary(job) for job in reversed(self.jobs.values())]
+
+    def _update_file(self, job_id: str, file_path: str, **fields):
+        with self._lock:
+            job = self.jobs[job_id]
+            entry = job["files"][file_path]
+            entry.update(fields)
+            file_event = dict(entry)
+            job_event = self._job_summary(job)
+        self._publish({"type": "file", "job_id": job_id, **file_event})
+        self._publish({"type": "job", **job_event})
+
+    def _trim_jobs(self):
+        # Drop the oldest finished jobs beyond MAX_JOBS_KEPT
+        while len(self.jobs) > MAX_JOBS_KEPT:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if self._job_summary(oldest)["status"] in (STATUS_QUEUED, STATUS_RUNNING):
+                break
+            del self.jobs[oldest_id]
+
+    # Work
+
+    def submit(self, file_paths: List[str]) -> str:
+        """
+        Enqueue extraction of the given transcript files and return the job id.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "job_id": job_id,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": OrderedDict(
+                (path, {"file": os.path.basename(path), "status": STATUS_QUEUED,
+                        "statements": 0, "error": ""})
+                for path in file_paths
+            ),
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+            self._trim_jobs()
+            summary = self._job_summary(job)
+        self._publish({"type": "job", **summary})
+
+        for path in file_paths:
+            self.executor.submit(self._run_file, job_id, path)
+        return job_id
+
+    def _run_file(self, job_id: str, file_path: str):
+        record = FileRecord()
+        try:
+            if self.manifest is not None and not self.manifest.needs_processing(file_path):
+                self._update_file(job_id, file_path, status=STATUS_SKIPPED)
+                return
+
+            self._update_file(job_id, file_path, status=STATUS_RUNNING)
+            if self.manifest is not None:
+                self.manifest.mark_processing(file_path)
+
+            with record.active():
+                rows = financial_analysis.extract_transcript_rows(file_path, self.rate_limiter, self.cache)
+
+                # One writer at a time keeps rows from different files apart
+                with self._write_lock:
+                    financial_analysis.write_extracted_rows(file_path, rows, self.output_csv_path,
+                                                            self.manifest, self.store)
+
+            log_file(file_path, record, STATUS_DONE, len(rows))
+            self._update_file(job_id, file_path, status=STATUS_DONE, statements=len(rows))
+        except Exception as e:
+            if self.manifest is not None:
+                self.manifest.mark_failed(file_path, str(e))
+            log_file(file_path, record, STATUS_FAILED, 0, error=str(e))
+            self._update_file(job_id, file_path, status=STATUS_FAILED, error=str(e))
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -2,15 +2,90 @@ import os
 import re
 import csv
 import json
+import time
+import threading
 import requests
 import pandas as pd
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
 
+from rate_limiter import RateLimiter
+from deepseek_client import DeepSeekClient, DeepSeekAPIError, iter_stream_content
+from incremental_json import StatementStreamParser, parse_statements
+from response_cache import ResponseCache, make_cache_key
+from transcript_chunking import chunk_transcript, merge_statements
+from transcript_prefilter import prefilter_transcript
+from paragraph_index import ParagraphIndex
+from transcript_batching import BATCH_INSTRUCTIONS, BATCH_SEPARATOR, pack_transcripts, packed_size, format_batch, split_batch_statements
+from run_manifest import RunManifest
+from results_store import ResultsStore, results_store_path_for
+from transcript_watcher import is_transcript_file, scan_transcripts
+from metric_normalization import columnar_path_for, write_columnar
+from value_normalization import normalize_statement
+from pipeline_metrics import METRICS, FileRecord, bind, timed, add_time, count, log_event, log_file
+
 # DeepSeek API configuration parameters
 # TODO: Please replace with your own DeepSeek API Key
 DEEPSEEK_API_KEY = "your_api_key_here"
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_MODEL = "deepseek-chat"
+MAX_COMPLETION_TOKENS = 2000
+STREAMING_ENABLED = True         # Stream completions and emit each statement as soon as it closes
+
+# HTTP client configuration
+API_CONNECT_TIMEOUT = 10         # Seconds to establish a connection
+API_READ_TIMEOUT = 120           # Seconds to wait for a completion
+API_MAX_RETRIES = 5              # Retries for 429, 5xx, connection errors and timeouts
+API_BACKOFF_BASE = 1.0           # First retry delay in seconds, doubled on each retry (with jitter)
+API_BACKOFF_MAX = 60.0
+
+TRANSCRIPT_CHAR_LIMIT = 20000    # Maximum transcript characters sent per request (one chunk)
+
+# Long transcripts are split on speaker turns and the chunks extracted in parallel
+CHUNK_OVERLAP_CHARS = 1500       # Trailing speaker turns repeated at the start of the next chunk
+CHUNK_WORKERS = 4                # Parallel requests per transcript
+
+# Local pre-filter sending only candidate forward-looking sentences to the API
+PREFILTER_ENABLED = True
+PREFILTER_CONTEXT_SENTENCES = 1  # Neighbouring sentences kept around each candidate
+
+# Index of paragraphs already extracted, shared by all transcripts: boilerplate repeated
+# across calls (safe-harbor statements, operator scripts) is sent once
+PARAGRAPH_DEDUP_ENABLED = True
+PARAGRAPH_INDEX_PATH = "paragraph_index.sqlite"
+
+# Short transcripts are packed into shared requests so the prompt is sent once per group
+BATCHING_ENABLED = True
+BATCH_SMALL_TRANSCRIPT_TOKENS = 1500   # Transcripts at or below this size (after pre-filtering) are packed
+BATCH_CHAR_BUDGET = TRANSCRIPT_CHAR_LIMIT         # Characters per packed request, file markers included
+BATCH_MAX_FILES = 8
+BATCH_MAX_COMPLETION_TOKENS = 8000     # Completion budget of a packed request (MAX_COMPLETION_TOKENS per file up to this)
+
+# Concurrency and rate limiting configuration
+MAX_WORKERS = 4                 # Number of transcripts extracted in parallel
+REQUESTS_PER_MINUTE = 60        # DeepSeek request budget shared by all workers
+TOKENS_PER_MINUTE = 200000      # DeepSeek prompt + completion token budget
+
+# Response cache configuration
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_PATH = "deepseek_cache.sqlite"
+RESPONSE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+RESPONSE_CACHE_MAX_AGE_DAYS = 90
+RESPONSE_CACHE_BYPASS = False   # Always call the API but refresh cached responses
+
+# Processed-file manifest stored next to the output CSV, used to skip finished files and resume crashed runs
+MANIFEST_ENABLED = True
+
+# Indexed SQLite store of the extracted statements next to the output CSV, queried by the web app
+RESULTS_STORE_ENABLED = True
+
+# Typed, dictionary-encoded Parquet copy of the output CSV (requires pyarrow)
+COLUMNAR_OUTPUT_ENABLED = True
+
+# Metric values re-derived from each statement's sentence by value_normalization
+VALUE_NORMALIZATION_ENABLED = True
+RAW_VALUE_SPANS = True          # Ask the model for values as written; only used with VALUE_NORMALIZATION_ENABLED
 
 # US GAAP compliant financial metric categories for extraction
 US_GAAP_FINANCIAL_METRICS = [
@@ -31,6 +106,60 @@ US_GAAP_FINANCIAL_METRICS = [
     "dividend_yield"            # Dividend yield projections
 ]
 
+# Value rules of the extraction prompt. With VALUE_NORMALIZATION_ENABLED and RAW_VALUE_SPANS the
+# model only copies the numerical expression and value_normalization applies these rules locally.
+NORMALIZED_VALUE_RULES = """   - Extract ONLY pure numerical values, removing ALL text modifiers like "approximately", "over", "about", "around"
+   - For percentage ranges (e.g., "2%-5%"), calculate midpoint with correct sign (-3.5% for decline range)
+   - For "over X%" or "above X", record as X%
+   - For "under X%" or "below X", record as X%
+   - Remove ALL currency symbols and comma separators ("$1,000" → "1000")
+   - Standardize monetary units to pure numbers:
+     * "X million" → X * 1,000,000 (e.g., "150 million" → "150000000")
+     * "X billion" → X * 1,000,000,000 (e.g., "2.5 billion" → "2500000000")
+     * "X thousand" → X * 1,000 (e.g., "500 thousand" → "500000")
+   - Preserve sign semantics:
+     * Growth/increase/positive outlook: positive values (e.g., "increase by 5%" → "5%")
+     * Decline/decrease/negative outlook: negative values (e.g., "decrease by 8%" → "-8%")
+     * For ranges with decline semantics, ensure correct negative sign (e.g., "decrease by 2%-5%" → "-3.5%")
+   - For percentages, ALWAYS include the % symbol (e.g., "28%" not "28")
+   - For ratio metrics, record ONLY the numerical value (e.g., "1.5 to 1" → "1.5")
+   - When no specific numerical value is provided, leave the field empty
+"""
+NORMALIZED_METRIC_FIELDS = """      "revenue_growth": "numerical value if revenue growth mentioned (include % for percentages with correct sign)",
+      "capital_expenditure": "numerical value if capex mentioned (no currency symbols)",
+      "earnings_per_share": "numerical value if EPS mentioned",
+      "gross_margin": "numerical value if gross margin mentioned (include % for percentages with correct sign)",
+      "operating_margin": "numerical value if operating margin mentioned (include % for percentages with correct sign)",
+      "net_margin": "numerical value if net margin mentioned (include % for percentages with correct sign)",
+      "ebitda": "numerical value if EBITDA mentioned (no currency symbols)",
+      "return_on_equity": "numerical value if ROE mentioned (include % for percentages with correct sign)",
+      "return_on_assets": "numerical value if ROA mentioned (include % for percentages with correct sign)",
+      "debt_to_equity_ratio": "numerical value if debt to equity ratio mentioned",
+      "current_ratio": "numerical value if current ratio mentioned",
+      "quick_ratio": "numerical value if quick ratio mentioned",
+      "interest_coverage_ratio": "numerical value if interest coverage ratio mentioned",
+      "price_to_earnings_ratio": "numerical value if P/E ratio mentioned",
+      "dividend_yield": "numerical value if dividend yield mentioned (include % for percentages with correct sign)",
+"""
+RAW_VALUE_RULES = """   - Copy each numerical expression exactly as written in the sentence, including modifiers, currency symbols, units and range wording (e.g., "approximately $2.5 billion", "decrease by 2%-5%", "1.5 to 1")
+   - Do NOT convert, scale, average or re-sign values; they are normalized after extraction
+   - When no specific numerical value is provided, leave the field empty
+"""
+# System message paired with each set of value rules
+NORMALIZED_SYSTEM_MESSAGE = "You are a specialized financial analysis engine. Return only valid JSON in the specified format. For percentage values, ALWAYS include the % symbol and correct sign. For ranges, calculate the midpoint with correct sign. Use only US GAAP compliant financial metric names."
+RAW_SYSTEM_MESSAGE = "You are a specialized financial analysis engine. Return only valid JSON in the specified format. Copy numerical values exactly as written in the transcript. Use only US GAAP compliant financial metric names."
+RAW_METRIC_FIELDS = "".join(
+    f'      "{metric}": "numerical expression as written, if mentioned",\n' for metric in US_GAAP_FINANCIAL_METRICS
+)
+
+# Column layout of the extraction CSV
+CSV_FIELDNAMES = [
+    'year', 'month', 'day', 'ticker', 'exchange', 'filename',
+    'financial_category', 'forward_looking_sentence',
+    *US_GAAP_FINANCIAL_METRICS,
+    'speaker', 'extraction_date'
+]
+
 
 def extract_company_info_from_filename(filename: str) -> Dict[str, str]:
 
@@ -59,12 +188,127 @@ def extract_company_info_from_filename(filename: str) -> Dict[str, str]:
             "ticker": "", "exchange": ""}
 
 
-def call_deepseek_api(text: str) -> Dict[str, Any]:
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_deepseek_client() -> DeepSeekClient:
     """
-    Invoke DeepSeek LLM API to extract forward-looking financial statements from earnings call transcripts.
-    Implements structured prompting for financial information extraction with specific formatting requirements.
+    Shared DeepSeek client, created on first use so all workers reuse one connection pool.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DeepSeekClient(
+                DEEPSEEK_API_KEY, DEEPSEEK_API_URL,
+                pool_size=MAX_WORKERS * CHUNK_WORKERS,
+                max_retries=API_MAX_RETRIES,
+                backoff_base=API_BACKOFF_BASE,
+                backoff_max=API_BACKOFF_MAX,
+                connect_timeout=API_CONNECT_TIMEOUT,
+                read_timeout=API_READ_TIMEOUT
+            )
+        return _client
+
+
+def set_api_key(api_key: str):
+    """
+    Switch the API key for this process; the shared client is rebuilt on next use.
+    """
+    global DEEPSEEK_API_KEY, _client
+    with _client_lock:
+        DEEPSEEK_API_KEY = api_key
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+_paragraph_index = None
+_paragraph_index_lock = threading.Lock()
+
+
+def get_paragraph_index() -> Optional[ParagraphIndex]:
+    """
+    Shared paragraph index, or None if PARAGRAPH_DEDUP_ENABLED is off.
+    Entries are scoped to the current prompt and model, so changing either starts afresh.
+    """
+    global _paragraph_index
+    if not PARAGRAPH_DEDUP_ENABLED:
+        return None
+    with _paragraph_index_lock:
+        if _paragraph_index is None:
+            version = make_cache_key(build_extraction_payload(""))[:16]
+            _paragraph_index = ParagraphIndex(PARAGRAPH_INDEX_PATH, version)
+        return _paragraph_index
+
+
+def strip_known_paragraphs(company_info: Dict[str, str], text: str):
+    """
+    Remove paragraphs the paragraph index already knows from other transcripts.
+    
+    Returns:
+        tuple: (text to send, statements of removed paragraphs, sent paragraphs for
+                ParagraphIndex.record(), or None if PARAGRAPH_DEDUP_ENABLED is off)
     """
+    index = get_paragraph_index()
+    if index is None:
+        return text, [], None
+    call_year = int(company_info["year"]) if company_info["year"] else 0
+    with timed("dedup"):
+        stripped, reused, sent = index.strip(text, company_info["ticker"], call_year)
+    if len(stripped) < len(text):
+        count("dedup_tokens_saved", (len(text) - len(stripped)) // 4)
+    return stripped, reused, sent
+
+
+def open_results_store(output_csv_path: str) -> Optional[ResultsStore]:
+    """
+    Open the results store next to the output CSV, or None if RESULTS_STORE_ENABLED is off.
+    A new store is filled from the rows already in the CSV.
+    """
+    if not RESULTS_STORE_ENABLED:
+        return None
+    store = ResultsStore(results_store_path_for(output_csv_path))
+    if store.is_empty() and not csv_needs_header(output_csv_path):
+        imported = store.import_csv(output_csv_path)
+        print(f"Imported {imported} existing rows from {output_csv_path} into {store.db_path}")
+    return store
+
+
+def open_response_cache() -> Optional[ResponseCache]:
+    """
+    Open the response cache configured by the RESPONSE_CACHE_* settings, or None if disabled.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    return ResponseCache(RESPONSE_CACHE_PATH,
+                         max_bytes=RESPONSE_CACHE_MAX_BYTES,
+                         max_age_seconds=RESPONSE_CACHE_MAX_AGE_DAYS * 24 * 3600,
+                         bypass=RESPONSE_CACHE_BYPASS)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for rate limiting (roughly 4 characters per token for English text).
+    """
+    return len(text) // 4 + 1
+
+
+def build_extraction_payload(text: str, batch: bool = False, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Chat completion request extracting forward-looking statements from transcript text.
+    See call_deepseek_api for the arguments.
+    """
+    if max_tokens is None:
+        max_tokens = MAX_COMPLETION_TOKENS
     
+    if VALUE_NORMALIZATION_ENABLED and RAW_VALUE_SPANS:
+        value_rules, metric_fields = RAW_VALUE_RULES, RAW_METRIC_FIELDS
+        system_message = RAW_SYSTEM_MESSAGE
+    else:
+        value_rules, metric_fields = NORMALIZED_VALUE_RULES, NORMALIZED_METRIC_FIELDS
+        system_message = NORMALIZED_SYSTEM_MESSAGE
+
     prompt = f"""Act as a financial analysis engine specialized in extracting forward-looking statements from earnings call transcripts.
 Ensure all extracted financial metrics conform to US GAAP standards and terminology.
 
@@ -89,175 +333,628 @@ Extraction specifications:
 1. Extract only future period statements (e.g., for 2023 transcript, extract 2024+, not historical data)
 2. Perform full context analysis of the transcript
 3. Numerical value extraction requirements:
-   - Extract ONLY pure numerical values, removing ALL text modifiers like "approximately", "over", "about", "around"
-   - For percentage ranges (e.g., "2%-5%"), calculate midpoint with correct sign (-3.5% for decline range)
-   - For "over X%" or "above X", record as X%
-   - For "under X%" or "below X", record as X%
-   - Remove ALL currency symbols and comma separators ("$1,000" → "1000")
-   - Standardize monetary units to pure numbers:
-     * "X million" → X * 1,000,000 (e.g., "150 million" → "150000000")
-     * "X billion" → X * 1,000,000,000 (e.g., "2.5 billion" → "2500000000")
-     * "X thousand" → X * 1,000 (e.g., "500 thousand" → "500000")
-   - Preserve sign semantics:
-     * Growth/increase/positive outlook: positive values (e.g., "increase by 5%" → "5%")
-     * Decline/decrease/negative outlook: negative values (e.g., "decrease by 8%" → "-8%")
-     * For ranges with decline semantics, ensure correct negative sign (e.g., "decrease by 2%-5%" → "-3.5%")
-   - For percentages, ALWAYS include the % symbol (e.g., "28%" not "28")
-   - For ratio metrics, record ONLY the numerical value (e.g., "1.5 to 1" → "1.5")
-   - When no specific numerical value is provided, leave the field empty
-
+{value_rules}
 Response format specification:
 {{
   "forward_looking_statements": [
     {{
       "category": "revenue_growth|capital_expenditure|earnings_per_share|gross_margin|operating_margin|net_margin|ebitda|return_on_equity|return_on_assets|debt_to_equity_ratio|current_ratio|quick_ratio|interest_coverage_ratio|price_to_earnings_ratio|dividend_yield",
       "sentence": "complete sentence containing forward-looking information",
-      "revenue_growth": "numerical value if revenue growth mentioned (include % for percentages with correct sign)",
-      "capital_expenditure": "numerical value if capex mentioned (no currency symbols)",
-      "earnings_per_share": "numerical value if EPS mentioned",
-      "gross_margin": "numerical value if gross margin mentioned (include % for percentages with correct sign)",
-      "operating_margin": "numerical value if operating margin mentioned (include % for percentages with correct sign)",
-      "net_margin": "numerical value if net margin mentioned (include % for percentages with correct sign)",
-      "ebitda": "numerical value if EBITDA mentioned (no currency symbols)",
-      "return_on_equity": "numerical value if ROE mentioned (include % for percentages with correct sign)",
-      "return_on_assets": "numerical value if ROA mentioned (include % for percentages with correct sign)",
-      "debt_to_equity_ratio": "numerical value if debt to equity ratio mentioned",
-      "current_ratio": "numerical value if current ratio mentioned",
-      "quick_ratio": "numerical value if quick ratio mentioned",
-      "interest_coverage_ratio": "numerical value if interest coverage ratio mentioned",
-      "price_to_earnings_ratio": "numerical value if P/E ratio mentioned",
-      "dividend_yield": "numerical value if dividend yield mentioned (include % for percentages with correct sign)",
-      "speaker": "identified speaker if available"
+{metric_fields}      "speaker": "identified speaker if available"
     }}
   ]
 }}
 
-Transcript content for analysis:
-{text[:20000]}
+{BATCH_INSTRUCTIONS if batch else ""}Transcript content for analysis:
+{text if batch else text[:TRANSCRIPT_CHAR_LIMIT]}
 """
 
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
-        "model": "deepseek-chat",
+        "model": DEEPSEEK_MODEL,
         "messages": [
-            {"role": "system", "content": "You are a specialized financial analysis engine. Return only valid JSON in the specified format. For percentage values, ALWAYS include the % symbol and correct sign. For ranges, calculate the midpoint with correct sign. Use only US GAAP compliant financial metric names."},
+            {"role": "system", "content": system_message},
             {"role": "user", "content": prompt}
         ],
         "temperature": 0.1,
-        "max_tokens": 2000
+        "max_tokens": max_tokens
     }
+    return payload
+
+
+def call_deepseek_api(text: str, rate_limiter: Optional[RateLimiter] = None,
+                      cache: Optional[ResponseCache] = None,
+                      client: Optional[DeepSeekClient] = None,
+                      on_statement: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      batch: bool = False, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Invoke DeepSeek LLM API to extract forward-looking financial statements from earnings call transcripts.
+    Implements structured prompting for financial information extraction with specific formatting requirements.
+
+    Args:
+        text (str): Transcript content
+        rate_limiter (RateLimiter): Optional shared limiter acquired before the request is sent
+        cache (ResponseCache): Optional response cache consulted before the request is sent
+        client (DeepSeekClient): HTTP client; the shared client from get_deepseek_client() if not given
+        on_statement (callable): Called with each statement as soon as it is available;
+            with STREAMING_ENABLED this is while the completion is still being generated
+        batch (bool): text is several transcripts joined by format_batch(); statements
+            are then tagged with a "file" field
+        max_tokens (int): Completion token limit, MAX_COMPLETION_TOKENS if not given
+    
+    Returns:
+        dict: Parsed response with "forward_looking_statements"; "incomplete" is set
+            when the completion was cut off or malformed, so statements may be missing
+    
+    Raises:
+        DeepSeekAPIError: If the request still fails after retries, so the file is
+            reported as failed instead of silently yielding zero statements
+    """
+    if max_tokens is None:
+        max_tokens = MAX_COMPLETION_TOKENS
+    payload = build_extraction_payload(text, batch, max_tokens)
+    
+    # Identical transcript, prompt, model and parameters give an identical answer
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(payload)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            count("cache_hits")
+            if on_statement is not None:
+                for statement in cached.get("forward_looking_statements", []):
+                    on_statement(statement)
+            return cached
+    
+    if client is None:
+        client = get_deepseek_client()
+    
+    tokens = estimate_tokens(payload["messages"][-1]["content"]) + max_tokens
+    
+    if STREAMING_ENABLED:
+        result, complete = _stream_statements(client, payload, rate_limiter, tokens, on_statement)
+        # Output cut off at the token limit keeps its statements but is not cached
+        if not complete:
+            result["incomplete"] = True
+        elif cache is not None:
+            cache.put(cache_key, result)
+        return result
+    
+    # Retried with backoff; request and token budget are reserved before every attempt
+    with timed("api"):
+        response = _post(client, payload, rate_limiter, tokens)
+        body = response.content
     
     try:
-        # Execute API request with 60-second timeout
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
+        with timed("parse"):
+            result = json.loads(body)
+        record_usage(result.get("usage"))
         if "choices" in result and len(result["choices"]) > 0:
             content = result["choices"][0]["message"]["content"]
             # Extract JSON from response using regex
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
-                return json.loads(json_match.group())
-            return {"forward_looking_statements": []}
+                try:
+                    with timed("parse"):
+                        parsed = json.loads(json_match.group())
+                except json.JSONDecodeError as e:
+                    # Truncated or malformed output: keep every statement that did complete
+                    print(f"JSON parsing error: {e}; recovering complete statements")
+                    count("parse_failures")
+                    with timed("parse"):
+                        parsed = {"forward_looking_statements": parse_statements(content), "incomplete": True}
+                else:
+                    if cache is not None:
+                        cache.put(cache_key, parsed)
+                if on_statement is not None:
+                    for statement in parsed.get("forward_looking_statements", []):
+                        on_statement(statement)
+                return parsed
+            return {"forward_looking_statements": [], "incomplete": True}
         
-    except requests.exceptions.RequestException as e:
-        print(f"API request failure: {e}")
     except json.JSONDecodeError as e:
         print(f"JSON parsing error: {e}")
+        count("parse_failures")
+    
+    return {"forward_looking_statements": [], "incomplete": True}
+
+
+def _post(client: DeepSeekClient, payload: Dict[str, Any], rate_limiter: Optional[RateLimiter],
+          tokens: int, stream: bool = False):
+    # client.post with request, retry and failure counts
+    count("requests")
+    try:
+        response = client.post(payload, rate_limiter=rate_limiter, tokens=tokens, stream=stream)
+    except DeepSeekAPIError:
+        count("api_failures")
+        raise
+    count("retries", getattr(response, "retries", 0))
+    return response
+
+
+def record_usage(usage: Optional[Dict[str, Any]]):
+    """
+    Count the prompt and completion tokens of a response's usage block.
+    """
+    if usage:
+        count("prompt_tokens", usage.get("prompt_tokens") or 0)
+        count("completion_tokens", usage.get("completion_tokens") or 0)
+
+
+def _stream_statements(client: DeepSeekClient, payload: Dict[str, Any], rate_limiter: Optional[RateLimiter],
+                       tokens: int, on_statement: Optional[Callable[[Dict[str, Any]], None]]):
+    """
+    Send a streaming request and parse statements incrementally from the deltas.
+    
+    Returns:
+        tuple: (result dict, True if the completion finished normally)
+    
+    Raises:
+        DeepSeekAPIError: If the connection fails or closes before the completion finished
+    """
+    start = time.perf_counter()
+    response = _post(client, {**payload, "stream": True, "stream_options": {"include_usage": True}},
+                     rate_limiter, tokens, stream=True)
+    
+    parser = StatementStreamParser()
+    statements = []
+    finish_reason = None
+    parse_seconds = 0.0
+    try:
+        for delta, reason, usage in iter_stream_content(response):
+            finish_reason = reason or finish_reason
+            record_usage(usage)
+            parse_start = time.perf_counter()
+            completed = parser.feed(delta)
+            parse_seconds += time.perf_counter() - parse_start
+            for statement in completed:
+                statements.append(statement)
+                if on_statement is not None:
+                    on_statement(statement)
+    except requests.exceptions.RequestException as e:
+        # Raised rather than returned as a short result, so the file is failed and retried
+        count("api_failures")
+        raise DeepSeekAPIError(f"Stream interrupted after {len(statements)} statements: {e}") from e
+    finally:
+        response.close()
+    
+    # Network time excludes parsing, but includes time spent in on_statement
+    add_time("api", time.perf_counter() - start - parse_seconds)
+    add_time("parse", parse_seconds)
+    if parser.parse_errors:
+        count("parse_failures", parser.parse_errors)
+    
+    if finish_reason is None:
+        count("api_failures")
+        raise DeepSeekAPIError(f"Stream ended without a finish reason after {len(statements)} statements")
     
-    return {"forward_looking_statements": []}
+    if finish_reason == "length":
+        print(f"Completion hit max_tokens; kept {len(statements)} complete statements")
+        count("truncated_completions")
+    
+    complete = finish_reason == "stop" and parser.array_closed
+    return {"forward_looking_statements": statements}, complete
 
 
-def process_transcript_file(file_path: str, output_csv_path: str):
+def extract_forward_looking_statements(text: str, rate_limiter: Optional[RateLimiter] = None,
+                                      cache: Optional[ResponseCache] = None,
+                                      on_statement: Optional[Callable[[Dict[str, Any]], None]] = None
+                                      ) -> List[Dict[str, Any]]:
     """
-    Process individual transcript file and extract forward-looking financial statements.
+    Extract forward-looking statements from a transcript of any length.
+    
+    Transcripts longer than TRANSCRIPT_CHAR_LIMIT are split on speaker turns
+    into overlapping chunks, which are sent in parallel; the per-chunk
+    statements are merged with sentence-level deduplication.
     
     Args:
-        file_path (str): Path to transcript file
-        output_csv_path (str): Path to output CSV file
+        text (str): Full transcript content
+        rate_limiter (RateLimiter): Optional shared API rate limiter
+        cache (ResponseCache): Optional API response cache
+        on_statement (callable): Called once per returned statement; for single-chunk
+            transcripts as soon as the statement is streamed, otherwise after merging
+    """
+    return extract_statements(text, rate_limiter, cache, on_statement)[0]
+
+
+def extract_statements(text: str, rate_limiter: Optional[RateLimiter] = None,
+                       cache: Optional[ResponseCache] = None,
+                       on_statement: Optional[Callable[[Dict[str, Any]], None]] = None
+                       ) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    extract_forward_looking_statements, also reporting whether every response was complete.
+    
+    Returns:
+        tuple: (statements, False if any completion was cut off or malformed)
+    """
+    chunks = chunk_transcript(text, TRANSCRIPT_CHAR_LIMIT, CHUNK_OVERLAP_CHARS)
+    
+    if len(chunks) == 1:
+        result = call_deepseek_api(chunks[0], rate_limiter=rate_limiter, cache=cache, on_statement=on_statement)
+        return result.get("forward_looking_statements", []), not result.get("incomplete")
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(CHUNK_WORKERS, len(chunks)))) as executor:
+        results = list(executor.map(
+            bind(lambda chunk: call_deepseek_api(chunk, rate_limiter=rate_limiter, cache=cache)),
+            chunks
+        ))
+    
+    merged = merge_statements([result.get("forward_looking_statements", []) for result in results])
+    
+    # Duplicates across chunks are only known once every chunk is done
+    if on_statement is not None:
+        for statement in merged:
+            on_statement(statement)
+    return merged, not any(result.get("incomplete") for result in results)
+
+
+def build_csv_row(company_info: Dict[str, str], statement: Dict[str, Any]) -> Dict[str, Any]:
     """
+    Flatten one extracted statement into a CSV row with the transcript metadata.
+    With VALUE_NORMALIZATION_ENABLED the metric values are re-derived from the sentence.
+    """
+    if VALUE_NORMALIZATION_ENABLED:
+        with timed("normalize"):
+            statement, corrections = normalize_statement(statement)
+        if corrections:
+            count("value_corrections", corrections)
+    row = {
+        **company_info,
+        "financial_category": statement.get("category", ""),
+        "forward_looking_sentence": statement.get("sentence", ""),
+    }
+    for metric in US_GAAP_FINANCIAL_METRICS:
+        row[metric] = statement.get(metric, "")
+    row["speaker"] = statement.get("speaker", "")
+    row["extraction_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return row
+
+
+def load_transcript(file_path: str, verbose: bool = True) -> Tuple[Dict[str, str], str]:
+    """
+    Read a transcript and apply the pre-filter.
+    
+    Returns:
+        tuple: (company info parsed from the filename, text to send to the API)
+    """
+    company_info, transcript_text, stats = _load_prefiltered(file_path)
+    if verbose and stats is not None:
+        print_prefilter_stats(company_info["filename"], stats)
+    return company_info, transcript_text
+
+
+def print_prefilter_stats(filename: str, stats: Dict[str, Any]):
+    print(f"Pre-filter {filename}: kept {stats['kept_sentences']}/{stats['total_sentences']} sentences, "
+          f"~{stats['original_tokens']} -> {stats['filtered_tokens']} tokens "
+          f"(-{stats['token_reduction']:.0%})")
+
+
+def _load_prefiltered(file_path: str) -> Tuple[Dict[str, str], str, Optional[Dict[str, Any]]]:
+    # load_transcript, also returning the pre-filter statistics (None when disabled)
     
     # Extract metadata from filename
     filename = os.path.basename(file_path)
     company_info = extract_company_info_from_filename(filename)
     
-    print(f"Processing transcript: {filename}")
+    # Load transcript content
+    with timed("read"), open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        transcript_text = file.read()
     
-    try:
-        # Load transcript content
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            transcript_text = file.read()
+    # Drop historical results and chatter before paying for prompt tokens
+    stats = None
+    if PREFILTER_ENABLED:
+        call_year = int(company_info["year"]) if company_info["year"] else 0
+        with timed("prefilter"):
+            transcript_text, stats = prefilter_transcript(transcript_text, call_year, PREFILTER_CONTEXT_SENTENCES)
+    
+    return company_info, transcript_text, stats
+
+
+def extract_transcript_rows(file_path: str, rate_limiter: Optional[RateLimiter] = None,
+                            cache: Optional[ResponseCache] = None,
+                            on_row: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Read one transcript and return its extracted statements as CSV rows.
+    Performs no file output, so it is safe to run from worker threads.
+    
+    A completion cut off at max_tokens or malformed fails the file rather than
+    returning its partial rows as if it were fully extracted.
+    
+    Args:
+        file_path (str): Path to transcript file
+        rate_limiter (RateLimiter): Optional shared API rate limiter
+        cache (ResponseCache): Optional API response cache
+        on_row (callable): Called with each row as soon as its statement is extracted
+    
+    Raises:
+        DeepSeekAPIError: If a request fails or a completion is incomplete
+    """
+    
+    company_info, transcript_text = load_transcript(file_path)
+    if not transcript_text:
+        return []
+    
+    rows = []
+    
+    def add_row(statement: Dict[str, Any]):
+        row = build_csv_row(company_info, statement)
+        rows.append(row)
+        if on_row is not None:
+            on_row(row)
+    
+    # Paragraphs seen in earlier transcripts are answered from the index
+    transcript_text, reused, sent = strip_known_paragraphs(company_info, transcript_text)
+    for statement in reused:
+        add_row(statement)
+    if not transcript_text.strip():
+        return rows
+    
+    # Extract forward-looking statements via API
+    statements, complete = extract_statements(transcript_text, rate_limiter=rate_limiter, cache=cache,
+                                              on_statement=add_row)
+    if not complete:
+        raise DeepSeekAPIError(f"Incomplete extraction: completion truncated or malformed "
+                               f"after {len(statements)} statements")
+    if sent is not None:
+        get_paragraph_index().record(sent, statements)
+    
+    return rows
+
+
+def plan_transcript_batches(file_paths: List[str]) -> Tuple[List[List[str]], Dict[str, Tuple[Dict[str, str], str]]]:
+    """
+    Group files into extraction requests: transcripts of at most BATCH_SMALL_TRANSCRIPT_TOKENS
+    (after pre-filtering) are packed up to BATCH_CHAR_BUDGET characters of format_batch()
+    output per request, all others go alone.
+    
+    Returns:
+        tuple: (file path groups, {file_path: (company_info, text)} for files in packed groups)
+    """
+    groups = []
+    small = []
+    loaded = {}
+    packed_names = set()
+    prefilter_stats = {}
+    
+    for file_path in sorted(file_paths):
+        try:
+            # Files that end up alone are loaded again, and reported, by extract_transcript_rows
+            company_info, text, prefilter_stats[file_path] = _load_prefiltered(file_path)
+        except OSError:
+            # Left to the worker, which reports the error for this file
+            groups.append([file_path])
+            continue
         
-        # Extract forward-looking statements via API
-        api_result = call_deepseek_api(transcript_text)
+        # Statements are split back by filename, so a name seen in another subdirectory goes alone
+        filename = company_info["filename"]
+        if text and estimate_tokens(text) <= BATCH_SMALL_TRANSCRIPT_TOKENS and filename not in packed_names:
+            packed_names.add(filename)
+            # Sized as formatted, so the markers and separators fit in the request too
+            small.append((file_path, packed_size(filename, text)))
+            loaded[file_path] = (company_info, text)
+        else:
+            groups.append([file_path])
+    
+    for group in pack_transcripts(small, BATCH_CHAR_BUDGET + len(BATCH_SEPARATOR), BATCH_MAX_FILES):
+        if len(group) == 1:
+            del loaded[group[0]]
+        else:
+            for file_path in group:
+                if prefilter_stats.get(file_path) is not None:
+                    print_prefilter_stats(loaded[file_path][0]["filename"], prefilter_stats[file_path])
+        groups.append(group)
+    
+    return groups, loaded
+
+
+def extract_batch_rows(transcripts: List[Tuple[str, Dict[str, str], str]],
+                       rate_limiter: Optional[RateLimiter] = None,
+                       cache: Optional[ResponseCache] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract several short transcripts with a single request and split the rows back per file.
+    If a returned statement cannot be matched to one of the files, the transcripts
+    are extracted again one per request rather than written without it.
+    
+    Args:
+        transcripts (list): (file_path, company_info, text) for each packed transcript
+        rate_limiter (RateLimiter): Optional shared API rate limiter
+        cache (ResponseCache): Optional API response cache
+    
+    Returns:
+        dict: CSV rows per file path
+    
+    Raises:
+        DeepSeekAPIError: If the request fails or the completion is incomplete; the
+            statements of the missing part could belong to any of the files
+    """
+    # Paragraphs seen in earlier transcripts are answered from the index
+    statements = {company_info["filename"]: [] for _, company_info, _ in transcripts}
+    if len(statements) < len(transcripts):
+        raise ValueError("Packed transcripts must have distinct filenames")
+    named, sent_by_file = [], {}
+    for _, company_info, text in transcripts:
+        text, reused, sent = strip_known_paragraphs(company_info, text)
+        statements[company_info["filename"]] += reused
+        if text.strip():
+            named.append((company_info["filename"], text))
+            sent_by_file[company_info["filename"]] = sent
+    
+    if named:
+        max_tokens = min(BATCH_MAX_COMPLETION_TOKENS, MAX_COMPLETION_TOKENS * len(named))
+        result = call_deepseek_api(format_batch(named), rate_limiter=rate_limiter, cache=cache,
+                                   batch=True, max_tokens=max_tokens)
+        if result.get("incomplete"):
+            raise DeepSeekAPIError(f"Incomplete extraction of {len(named)} packed transcripts: "
+                                   f"completion truncated or malformed")
+        
+        by_file, dropped = split_batch_statements(result.get("forward_looking_statements", []), named)
+        if dropped:
+            # A statement that matches no file could belong to any of them
+            print(f"{dropped} statements could not be matched to a packed transcript; "
+                  f"extracting the {len(transcripts)} transcripts separately")
+            return {file_path: extract_transcript_rows(file_path, rate_limiter, cache)
+                    for file_path, _, _ in transcripts}
         
-        # Prepare CSV output data
-        csv_data = []
-        for statement in api_result.get("forward_looking_statements", []):
-            row = {
-                **company_info,
-                "financial_category": statement.get("category", ""),
-                "forward_looking_sentence": statement.get("sentence", ""),
-                "revenue_growth": statement.get("revenue_growth", ""),
-                "capital_expenditure": statement.get("capital_expenditure", ""),
-                "earnings_per_share": statement.get("earnings_per_share", ""),
-                "gross_margin": statement.get("gross_margin", ""),
-                "operating_margin": statement.get("operating_margin", ""),
-                "net_margin": statement.get("net_margin", ""),
-                "ebitda": statement.get("ebitda", ""),
-                "return_on_equity": statement.get("return_on_equity", ""),
-                "return_on_assets": statement.get("return_on_assets", ""),
-                "debt_to_equity_ratio": statement.get("debt_to_equity_ratio", ""),
-                "current_ratio": statement.get("current_ratio", ""),
-                "quick_ratio": statement.get("quick_ratio", ""),
-                "interest_coverage_ratio": statement.get("interest_coverage_ratio", ""),
-                "price_to_earnings_ratio": statement.get("price_to_earnings_ratio", ""),
-                "dividend_yield": statement.get("dividend_yield", ""),
-                "speaker": statement.get("speaker", ""),
-                "extraction_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            csv_data.append(row)
+        for filename, extracted in by_file.items():
+            statements[filename] += extracted
+            if sent_by_file[filename] is not None:
+                get_paragraph_index().record(sent_by_file[filename], extracted)
+    
+    return {
+        file_path: [build_csv_row(company_info, statement) for statement in statements[company_info["filename"]]]
+        for file_path, company_info, _ in transcripts
+    }
+
+
+def csv_needs_header(output_csv_path: str) -> bool:
+    return not os.path.exists(output_csv_path) or os.path.getsize(output_csv_path) == 0
+
+
+def write_rows_to_csv(rows: List[Dict[str, Any]], output_csv_path: str):
+    """
+    Append rows to the extraction CSV, writing the header if the file is new or empty.
+    Must only be called from a single writer at a time.
+    """
+    write_header = csv_needs_header(output_csv_path)
+    
+    with open(output_csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
         
-        # Append results to CSV output
-        file_exists = os.path.exists(output_csv_path)
+        # Write header for new files
+        if write_header:
+            writer.writeheader()
         
-        with open(output_csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'year', 'month', 'day', 'ticker', 'exchange', 'filename',
-                'financial_category', 'forward_looking_sentence',
-                'revenue_growth', 'capital_expenditure', 'earnings_per_share',
-                'gross_margin', 'operating_margin', 'net_margin', 'ebitda',
-                'return_on_equity', 'return_on_assets', 'debt_to_equity_ratio',
-                'current_ratio', 'quick_ratio', 'interest_coverage_ratio',
-                'price_to_earnings_ratio', 'dividend_yield',
-                'speaker', 'extraction_date'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            # Write header for new files
-            if not file_exists:
+        writer.writerows(rows)
+
+
+def write_extracted_rows(file_path: str, rows: List[Dict[str, Any]], output_csv_path: str,
+                         manifest: Optional[RunManifest] = None, store: Optional[ResultsStore] = None):
+    """
+    Append one transcript's rows to the CSV, store them in the results store and
+    record the file as done in the manifest. The CSV offset is recorded first so a
+    crash mid-write can be rolled back; the store replaces the file's rows, so a
+    file written again after a crash is not duplicated there either. With a
+    manifest, the write holds its cross-process writer lock.
+    """
+    if manifest is None:
+        with timed("write"):
+            write_rows_to_csv(rows, output_csv_path)
+            if store is not None:
+                store.replace_file(file_path, rows)
+        return
+    
+    # Other processes appending to the same CSV wait until this file is written
+    with manifest.writing(output_csv_path):
+        offset = os.path.getsize(output_csv_path) if os.path.exists(output_csv_path) else 0
+        manifest.mark_writing(file_path, offset)
+        try:
+            with timed("write"):
+                write_rows_to_csv(rows, output_csv_path)
+                if store is not None:
+                    store.replace_file(file_path, rows)
+        except Exception:
+            # The caller marks the file failed; drop its partial rows first
+            if os.path.exists(output_csv_path) and os.path.getsize(output_csv_path) > offset:
+                with open(output_csv_path, 'r+b') as csvfile:
+                    csvfile.truncate(offset)
+            raise
+        manifest.mark_done(file_path, len(rows))
+
+
+def process_transcript_file(file_path: str, output_csv_path: str,
+                            rate_limiter: Optional[RateLimiter] = None,
+                            cache: Optional[ResponseCache] = None,
+                            store: Optional[ResultsStore] = None) -> int:
+    """
+    Process individual transcript file and extract forward-looking financial statements.
+    
+    Args:
+        file_path (str): Path to transcript file
+        output_csv_path (str): Path to output CSV file
+        rate_limiter (RateLimiter): Optional shared API rate limiter
+        cache (ResponseCache): Optional API response cache
+        store (ResultsStore): Optional results store, updated once the file is extracted
+    
+    Returns:
+        int: Number of statements written
+    """
+    
+    filename = os.path.basename(file_path)
+    print(f"Processing transcript: {filename}")
+    
+    record = FileRecord()
+    offset = os.path.getsize(output_csv_path) if os.path.exists(output_csv_path) else 0
+    try:
+        write_header = csv_needs_header(output_csv_path)
+        
+        # Append each row to the CSV output as soon as its statement is extracted
+        with record.active(), open(output_csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            if write_header:
                 writer.writeheader()
             
-            writer.writerows(csv_data)
+            def write_row(row: Dict[str, Any]):
+                with timed("write"):
+                    writer.writerow(row)
+                    csvfile.flush()
+            
+            csv_data = extract_transcript_rows(file_path, rate_limiter=rate_limiter, cache=cache,
+                                               on_row=write_row)
+            
+            if store is not None:
+                with timed("write"):
+                    store.replace_file(file_path, csv_data)
         
+        log_file(file_path, record, "done", len(csv_data))
         print(f"Completed {filename}: Extracted {len(csv_data)} statements")
+        return len(csv_data)
         
     except Exception as e:
+        # Drop the rows already streamed for this file, so a retry does not duplicate them
+        if os.path.exists(output_csv_path) and os.path.getsize(output_csv_path) > offset:
+            with open(output_csv_path, 'r+b') as csvfile:
+                csvfile.truncate(offset)
+        log_file(file_path, record, "failed", 0, error=str(e))
         print(f"Error processing {filename}: {e}")
+        return 0
+
+
+def manifest_path_for(output_csv_path: str) -> str:
+    """
+    Manifest location for an output CSV: financial_information.csv -> financial_information.manifest.sqlite
+    """
+    return f"{os.path.splitext(output_csv_path)[0]}.manifest.sqlite"
 
 
-def process_all_transcripts(directory_path: str, output_csv_path: str):
+def process_all_transcripts(directory_path: str, output_csv_path: str,
+                            max_workers: int = MAX_WORKERS,
+                            rate_limiter: Optional[RateLimiter] = None,
+                            cache: Optional[ResponseCache] = None,
+                            manifest: Optional[RunManifest] = None,
+                            store: Optional[ResultsStore] = None):
     """
     Batch process all transcript files in specified directory.
     
+    Transcripts are extracted concurrently by a thread pool, with API usage
+    throttled by a shared token-bucket rate limiter. Only the calling thread
+    writes to the CSV, so rows from different files never interleave. With
+    BATCHING_ENABLED, short transcripts are packed several to a request.
+    
+    With a manifest, files already extracted and unchanged are skipped, failed
+    files are retried, and rows half-written by a crashed run are truncated
+    before the run resumes.
+    
     Args:
         directory_path (str): Directory containing transcript files
         output_csv_path (str): Path to output CSV file
+        max_workers (int): Number of transcripts extracted in parallel
+        rate_limiter (RateLimiter): Shared limiter; built from REQUESTS_PER_MINUTE
+            and TOKENS_PER_MINUTE if not given
+        cache (ResponseCache): Response cache; opened at RESPONSE_CACHE_PATH if not
+            given and RESPONSE_CACHE_ENABLED is set
+        manifest (RunManifest): Processed-file manifest; opened next to the output
+            CSV if not given and MANIFEST_ENABLED is set
+        store (ResultsStore): Indexed results store; opened next to the output CSV
+            if not given and RESULTS_STORE_ENABLED is set
     """
     
     # Validate directory existence
@@ -265,22 +962,117 @@ def process_all_transcripts(directory_path: str, output_csv_path: str):
         print(f"Directory not found: {directory_path}")
         return
     
-    # Enumerate transcript files
-    transcript_files = []
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.txt') and 'Transcript' in filename:
-            transcript_files.append(os.path.join(directory_path, filename))
+    # Enumerate transcript files, including subdirectories
+    transcript_files = [path for path, _ in scan_transcripts(directory_path)]
     
     print(f"Located {len(transcript_files)} transcript files for processing")
     
-    # Process files sequentially
-    for i, file_path in enumerate(transcript_files, 1):
-        print(f"\nProcessing file {i}/{len(transcript_files)}")
-        process_transcript_file(file_path, output_csv_path)
+    if manifest is None and MANIFEST_ENABLED:
+        manifest = RunManifest(manifest_path_for(output_csv_path))
+    
+    if manifest is not None:
+        recovered = manifest.recover(output_csv_path)
+        if recovered:
+            print(f"Removed partial rows of {recovered} file(s) interrupted by a previous run")
         
-        # Rate limiting delay
-        import time
-        time.sleep(5)
+        located = len(transcript_files)
+        transcript_files = [f for f in transcript_files if manifest.needs_processing(f)]
+        print(f"Skipping {located - len(transcript_files)} unchanged files already extracted")
+    
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+    
+    if cache is None:
+        cache = open_response_cache()
+    
+    if store is None:
+        store = open_results_store(output_csv_path)
+    
+    start_time = time.time()
+    total_statements = 0
+    
+    if BATCHING_ENABLED:
+        groups, loaded = plan_transcript_batches(transcript_files)
+        if loaded:
+            packed = sum(1 for group in groups if len(group) > 1)
+            print(f"Packed {len(loaded)} short transcripts into {packed} requests")
+    else:
+        groups, loaded = [[file_path] for file_path in transcript_files], {}
+    
+    def extract(group: List[str]):
+        # Returns (rows per file, metrics record, error) so failures keep their record
+        record = FileRecord()
+        with record.active():
+            try:
+                if manifest is not None:
+                    for file_path in group:
+                        manifest.mark_processing(file_path)
+                if len(group) == 1:
+                    return {group[0]: extract_transcript_rows(group[0], rate_limiter, cache)}, record, None
+                loaded_group = [(file_path, *loaded[file_path]) for file_path in group]
+                return extract_batch_rows(loaded_group, rate_limiter, cache), record, None
+            except Exception as e:
+                return {}, record, e
+    
+    # Extract in parallel; write results from this thread as each file completes
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(extract, group): group for group in groups}
+        
+        for future in as_completed(futures):
+            rows_by_file, record, error = future.result()
+            group = futures[future]
+            
+            for file_path in group:
+                completed += 1
+                filename = os.path.basename(file_path)
+                try:
+                    if error is not None:
+                        raise error
+                    csv_data = rows_by_file[file_path]
+                    with record.active():
+                        write_extracted_rows(file_path, csv_data, output_csv_path, manifest, store)
+                    total_statements += len(csv_data)
+                    log_file(file_path, record, "done", len(csv_data), share=1 / len(group))
+                    print(f"[{completed}/{len(transcript_files)}] Completed {filename}: "
+                          f"Extracted {len(csv_data)} statements")
+                except Exception as e:
+                    if manifest is not None:
+                        manifest.mark_failed(file_path, str(e))
+                    log_file(file_path, record, "failed", 0, share=1 / len(group), error=str(e))
+                    print(f"[{completed}/{len(transcript_files)}] Error processing {filename}: {e}")
+    
+    elapsed = time.time() - start_time
+    print(f"Extracted {total_statements} statements from {len(transcript_files)} files in {elapsed:.1f}s")
+    log_event("run", directory=directory_path, files=len(transcript_files), statements=total_statements,
+              elapsed_seconds=round(elapsed, 2), process_totals=METRICS.snapshot())
+    
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    
+    paragraph_index = get_paragraph_index()
+    if paragraph_index is not None:
+        savings = paragraph_index.stats()["savings"]
+        for ticker, saved in sorted(savings.items()):
+            print(f"Paragraph index {ticker or '(unknown)'}: {saved['paragraphs']} repeated paragraphs not sent, "
+                  f"{saved['bytes']:,} bytes, ~{saved['tokens']:,} tokens saved")
+        if savings:
+            log_event("paragraph_dedup", directory=directory_path, savings=savings)
+    
+    client_stats = get_deepseek_client().stats()
+    if client_stats["requests"]:
+        print(f"API: {client_stats['requests']} requests, {client_stats['retries']} retries, "
+              f"{client_stats['failures']} failures, p50 latency {client_stats.get('latency_p50', 0):.2f}s, "
+              f"p95 {client_stats.get('latency_p95', 0):.2f}s")
+    
+    if COLUMNAR_OUTPUT_ENABLED and os.path.exists(output_csv_path):
+        columnar_path = columnar_path_for(output_csv_path)
+        try:
+            rows = write_columnar(output_csv_path, columnar_path)
+            print(f"Wrote {rows} normalized rows to {columnar_path}")
+        except ImportError:
+            print("pyarrow is not installed; skipping columnar output")
 
 
 if __name__ == "__main__":
@@ -291,4 +1083,4 @@ if __name__ == "__main__":
     # Execute batch processing pipeline
     process_all_transcripts(TRANSCRIPT_DIR, OUTPUT_CSV)
     
-    print(f"\nProcessing pipeline complete. Results saved to: {OUTPUT_CSV}")
\ No newline at end of file
+    print(f"\nProcessing pipeline complete. Results saved to: {OUTPUT_CSV}")
@@ -0,0 +1,84 @@
+import json
+from typing import List, Dict, Any
+
+
+class StatementStreamParser:
+    """
+    Incremental parser for {"forward_looking_statements": [ {...}, {...} ]}.
+
+    Text can be fed in arbitrary pieces (e.g. streamed completion deltas).
+    Every statement object is returned by feed() as soon as its closing brace
+    arrives, so statements that completed before the output was cut off at the
+    token limit are kept. Text before the first brace, such as a ```json fence,
+    is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.array_depth = None
+        self.object_start = None
+        self.array_closed = False
+        self.parse_errors = 0
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Consume more text and return the statements completed by it.
+        """
+        self.text += delta
+        text = self.text
+        completed = []
+
+        i = self.pos
+        while i < len(text):
+            ch = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{" or ch == "[":
+                self.depth += 1
+                # The statements array sits directly in the top-level object (or is the top level)
+                if ch == "[" and self.array_depth is None and self.depth <= 2:
+                    self.array_depth = self.depth
+                elif ch == "{" and self.array_depth is not None and self.depth == self.array_depth + 1:
+                    self.object_start = i
+            elif ch == "}" or ch == "]":
+                if ch == "}" and self.object_start is not None and self.depth == self.array_depth + 1:
+                    try:
+                        statement = json.loads(text[self.object_start:i + 1])
+                        if isinstance(statement, dict):
+                            completed.append(statement)
+                    except json.JSONDecodeError:
+                        self.parse_errors += 1
+                    self.object_start = None
+                elif ch == "]" and self.depth == self.array_depth:
+                    self.array_closed = True
+                self.depth -= 1
+            i += 1
+
+        # Keep only the statement still being received
+        if self.object_start is None:
+            self.text = ""
+            self.pos = 0
+        else:
+            self.text = text[self.object_start:]
+            self.pos = len(self.text)
+            self.object_start = 0
+
+        return completed
+
+
+def parse_statements(content: str) -> List[Dict[str, Any]]:
+    """
+    All complete statement objects in a (possibly truncated) completion.
+    """
+    return StatementStreamParser().feed(content)
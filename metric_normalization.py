@@ -0,0 +1,206 @@
+import os
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Unit flags
+UNIT_PERCENT = "percent"
+UNIT_CURRENCY = "currency"
+UNIT_RATIO = "ratio"
+UNIT_CODES = {UNIT_PERCENT: 0, UNIT_CURRENCY: 1, UNIT_RATIO: 2}
+
+# Unit assumed for each US_GAAP_FINANCIAL_METRICS category when the value has no % sign
+METRIC_UNITS = {
+    "revenue_growth": UNIT_PERCENT,
+    "capital_expenditure": UNIT_CURRENCY,
+    "earnings_per_share": UNIT_CURRENCY,
+    "gross_margin": UNIT_PERCENT,
+    "operating_margin": UNIT_PERCENT,
+    "net_margin": UNIT_PERCENT,
+    "ebitda": UNIT_CURRENCY,
+    "return_on_equity": UNIT_PERCENT,
+    "return_on_assets": UNIT_PERCENT,
+    "debt_to_equity_ratio": UNIT_RATIO,
+    "current_ratio": UNIT_RATIO,
+    "quick_ratio": UNIT_RATIO,
+    "interest_coverage_ratio": UNIT_RATIO,
+    "price_to_earnings_ratio": UNIT_RATIO,
+    "dividend_yield": UNIT_PERCENT,
+}
+
+# Columns stored dictionary-encoded in the columnar output
+DICTIONARY_COLUMNS = ["ticker", "exchange", "financial_category", "month"]
+
+SCALE_WORDS = {
+    "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "mm": 1e6, "m": 1e6,
+    "billion": 1e9, "bn": 1e9, "b": 1e9,
+    "trillion": 1e12, "tn": 1e12,
+}
+
+NUMBER = r"[-+]?\d+(?:\.\d+)?"
+RANGE_PATTERN = re.compile(rf"({NUMBER})\s*%?\s*(to|-|–|—)\s*({NUMBER})")
+# Ratio guidance written against 1: "1.5 to 1", "2:1", "1.5x to 1.0"
+RATIO_TO_ONE_PATTERN = re.compile(rf"({NUMBER})\s*(?:x|times)?\s*(?:to|:)\s*1(?:\.0+)?(?![\d.])")
+SCALE_PATTERN = re.compile(rf"\s*({'|'.join(sorted(SCALE_WORDS, key=len, reverse=True))})\b")
+NUMBER_PATTERN = re.compile(NUMBER)
+
+
+def _scale_at(text: str, pos: int) -> float:
+    # Multiplier for a "million"/"billion"/... word directly after position `pos`
+    match = SCALE_PATTERN.match(text, pos)
+    return SCALE_WORDS[match.group(1)] if match else 1.0
+
+
+@lru_cache(maxsize=65536)
+def parse_metric_value(raw: str, metric: str = "") -> Tuple[Optional[float], str]:
+    """
+    Parse an extracted metric string such as "-3.5%", "$2,500,000,000" or "1.5x".
+
+    Percentages are kept in percentage points ("5%" -> 5.0). Ranges become their
+    midpoint and "million"/"billion"/"thousand" suffixes are expanded. For ratio
+    metrics, "X to 1" and "X:1" are the ratio X, not a range.
+
+    >>> parse_metric_value("1.5 to 1", "current_ratio")
+    (1.5, 'ratio')
+    >>> parse_metric_value("2:1", "debt_to_equity_ratio")
+    (2.0, 'ratio')
+    >>> parse_metric_value("1.0 to 1.5", "quick_ratio")
+    (1.25, 'ratio')
+    >>> parse_metric_value("5% to 1%", "revenue_growth")
+    (3.0, 'percent')
+    >>> parse_metric_value("-2%-5%", "revenue_growth")
+    (-3.5, 'percent')
+    >>> parse_metric_value("-2% to 5%", "revenue_growth")
+    (1.5, 'percent')
+
+    Returns:
+        tuple: (value or None if no number is present, unit flag or "")
+    """
+    text = str(raw).strip().lower()
+    if not text or text == "nan":
+        return None, ""
+
+    unit = UNIT_PERCENT if ("%" in text or "percent" in text) else METRIC_UNITS.get(metric, "")
+
+    # Accounting notation for negatives: "(150)"
+    negative = text.startswith("(") and text.endswith(")")
+    text = re.sub(r"[$€£¥,()]", "", text).replace("−", "-")
+
+    ratio_match = RATIO_TO_ONE_PATTERN.search(text) if unit == UNIT_RATIO else None
+    range_match = RANGE_PATTERN.search(text) if ratio_match is None else None
+    if ratio_match:
+        value = float(ratio_match.group(1))
+        scale = 1.0
+    elif range_match:
+        low, high = float(range_match.group(1)), float(range_match.group(3))
+        # "-2%-5%" means a decline of 2 to 5 percent; "-2% to 5%" spans zero
+        if low < 0 < high and range_match.group(2) != "to":
+            high = -high
+        value = (low + high) / 2
+        scale = _scale_at(text, range_match.end())
+    else:
+        number_match = NUMBER_PATTERN.search(text)
+        if not number_match:
+            return None, unit
+        value = float(number_match.group())
+        scale = _scale_at(text, number_match.end())
+
+    if unit == UNIT_PERCENT:
+        scale = 1.0
+    value *= scale
+    if negative and value > 0:
+        value = -value
+    return value, unit
+
+
+def normalize_extraction(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert extraction rows to typed columns.
+
+    Each metric becomes a float column plus a `<metric>_unit` flag (percent,
+    currency or ratio), and ticker, exchange, financial_category and month are
+    dictionary-encoded as pandas categoricals.
+    """
+    normalized = df.copy()
+
+    for metric in METRIC_UNITS:
+        if metric not in normalized.columns:
+            continue
+        # Parse each distinct string once, then broadcast back to the rows
+        codes, uniques = pd.factorize(normalized[metric])
+        parsed = [parse_metric_value(raw, metric) for raw in uniques]
+        values = np.array([np.nan if value is None else value for value, _ in parsed] + [np.nan])
+        units = [unit or None for _, unit in parsed] + [None]
+
+        normalized[metric] = pd.array(values[codes], dtype="Float64")
+        normalized[f"{metric}_unit"] = pd.Categorical.from_codes(
+            np.array([UNIT_CODES.get(unit, -1) for unit in units])[codes],
+            categories=list(UNIT_CODES)
+        )
+
+    for column in ("year", "day"):
+        if column in normalized.columns:
+            normalized[column] = pd.to_numeric(normalized[column], errors="coerce").astype("Int32")
+    for column in DICTIONARY_COLUMNS:
+        if column in normalized.columns:
+            normalized[column] = normalized[column].astype("category")
+    if "extraction_date" in normalized.columns:
+        normalized["extraction_date"] = pd.to_datetime(normalized["extraction_date"], errors="coerce")
+
+    return normalized
+
+
+def columnar_path_for(output_csv_path: str) -> str:
+    """
+    Columnar output location for an extraction CSV: financial_information.csv -> financial_information.parquet
+    """
+    return f"{os.path.splitext(output_csv_path)[0]}.parquet"
+
+
+def write_columnar(csv_path: str, output_path: str, chunksize: int = 200_000) -> int:
+    """
+    Write a normalized copy of an extraction CSV as Parquet, or as Arrow IPC
+    if `output_path` ends in .arrow/.feather. The CSV is converted in chunks.
+
+    Requires pyarrow.
+
+    Returns:
+        int: Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    use_ipc = output_path.endswith((".arrow", ".feather"))
+    temp_path = output_path + ".tmp"
+    writer = None
+    schema = None
+    rows = 0
+
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=str, encoding="utf-8", chunksize=chunksize):
+            table = pa.Table.from_pandas(normalize_extraction(chunk), preserve_index=False)
+
+            if writer is None:
+                # Fix dictionary columns to string values so every chunk shares one schema
+                schema = pa.schema([
+                    pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+                    if pa.types.is_dictionary(field.type) else
+                    pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                writer = (pa.ipc.new_file(temp_path, schema) if use_ipc
+                          else pq.ParquetWriter(temp_path, schema))
+
+            writer.write_table(table.cast(schema))
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
+        os.replace(temp_path, output_path)
+    return rows
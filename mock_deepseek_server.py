@@ -0,0 +1,230 @@
+import re
+import json
+import time
+import math
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+# Default behaviour of the mock server
+LATENCY_DISTRIBUTION = "lognormal"   # constant | uniform | lognormal
+LATENCY_MEAN = 1.0                   # Mean response latency in seconds
+LATENCY_SIGMA = 0.5                  # Spread: +/- range for uniform, log-space sigma for lognormal
+RATE_LIMIT_PROBABILITY = 0.0         # Share of requests answered with 429
+RETRY_AFTER_SECONDS = 1
+MALFORMED_PROBABILITY = 0.0          # Share of completions with broken JSON content
+STREAM_CHUNK_CHARS = 40              # Content characters per streamed delta
+STATEMENTS_PER_RESPONSE = 5
+
+FILE_MARKER_PATTERN = re.compile(r"^=== FILE: (.+?) ===$", re.MULTILINE)
+FORWARD_LOOKING_PATTERN = re.compile(r"[^.!?\n]*\b(?:expect|guidance|target|project|outlook|plan)\w*\b[^.!?\n]*[.!?]",
+                                     re.IGNORECASE)
+
+
+class MockDeepSeekServer:
+    """
+    Local stand-in for the DeepSeek /v1/chat/completions endpoint.
+
+    Returns forward_looking_statements built from forward-looking sentences of
+    the submitted transcript, after a latency drawn from the configured
+    distribution. A share of requests can be answered with 429 + Retry-After,
+    or with malformed JSON content, to exercise the client's error handling.
+    Requests with "stream": true are answered with server-sent events; a
+    malformed streamed completion is cut off with finish_reason "length".
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind, 0 for any free port
+        latency_distribution (str): "constant", "uniform" or "lognormal"
+        latency_mean (float): Mean latency in seconds
+        latency_sigma (float): Uniform half-range or lognormal sigma
+        rate_limit_probability (float): Probability of a 429 response
+        retry_after (float): Retry-After value sent with 429 responses
+        malformed_probability (float): Probability of malformed JSON content
+        statements_per_response (int): Maximum statements per completion
+        seed (int): Random seed for reproducible runs
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_distribution: str = LATENCY_DISTRIBUTION,
+                 latency_mean: float = LATENCY_MEAN, latency_sigma: float = LATENCY_SIGMA,
+                 rate_limit_probability: float = RATE_LIMIT_PROBABILITY,
+                 retry_after: float = RETRY_AFTER_SECONDS,
+                 malformed_probability: float = MALFORMED_PROBABILITY,
+                 statements_per_response: int = STATEMENTS_PER_RESPONSE,
+                 seed: Optional[int] = None):
+        self.latency_distribution = latency_distribution
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.malformed_probability = malformed_probability
+        self.statements_per_response = statements_per_response
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "rate_limited": 0, "malformed": 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def sample_latency(self) -> float:
+        with self.lock:
+            if self.latency_distribution == "constant":
+                return self.latency_mean
+            if self.latency_distribution == "uniform":
+                return max(0.0, self.random.uniform(self.latency_mean - self.latency_sigma,
+                                                     self.latency_mean + self.latency_sigma))
+            # Lognormal with the requested mean
+            mu = math.log(self.latency_mean) - self.latency_sigma ** 2 / 2 if self.latency_mean > 0 else 0
+            return self.random.lognormvariate(mu, self.latency_sigma)
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counts[name] += 1
+
+    def _chance(self, probability: float) -> bool:
+        with self.lock:
+            return self.random.random() < probability
+
+    def build_statements(self, prompt: str) -> List[Dict[str, Any]]:
+        # Template statements from the transcript part of the prompt
+        transcript = prompt.split("Transcript content for analysis:", 1)[-1]
+
+        # Packed requests: statements per transcript, tagged with its filename
+        parts = FILE_MARKER_PATTERN.split(transcript)
+        if len(parts) > 1:
+            statements = []
+            for filename, text in zip(parts[1::2], parts[2::2]):
+                statements.extend({**statement, "file": filename} for statement in self._statements_for(text))
+            return statements
+
+        return self._statements_for(transcript)
+
+    def _statements_for(self, transcript: str) -> List[Dict[str, Any]]:
+        statements = []
+        for sentence in FORWARD_LOOKING_PATTERN.findall(transcript)[:self.statements_per_response]:
+            percent = re.search(r"-?\d+(?:\.\d+)?%", sentence)
+            statements.append({
+                "category": "revenue_growth",
+                "sentence": sentence.strip(),
+                "revenue_growth": percent.group() if percent else "",
+                "speaker": "",
+            })
+        return statements
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, content: str, finish_reason: str, model: str,
+                             usage: Optional[Dict[str, int]] = None):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write_event(data: str):
+                    event = f"data: {data}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+
+                for start in range(0, len(content), STREAM_CHUNK_CHARS):
+                    write_event(json.dumps({
+                        "id": "mock", "object": "chat.completion.chunk", "model": model,
+                        "choices": [{"index": 0, "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]},
+                                     "finish_reason": None}],
+                    }))
+                write_event(json.dumps({
+                    "id": "mock", "object": "chat.completion.chunk", "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                }))
+                if usage is not None:
+                    write_event(json.dumps({"id": "mock", "object": "chat.completion.chunk", "model": model,
+                                            "choices": [], "usage": usage}))
+                write_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server._count("requests")
+
+                if not self.path.endswith("/chat/completions"):
+                    self._send(404, b'{"error": "not found"}')
+                    return
+
+                if server._chance(server.rate_limit_probability):
+                    server._count("rate_limited")
+                    self._send(429, b'{"error": "rate limit exceeded"}',
+                               {"Retry-After": str(server.retry_after)})
+                    return
+
+                time.sleep(server.sample_latency())
+
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                content = json.dumps({"forward_looking_statements": server.build_statements(prompt)})
+                finish_reason = "stop"
+                if server._chance(server.malformed_probability):
+                    server._count("malformed")
+                    content = content[:len(content) // 2]
+                    finish_reason = "length"
+
+                prompt_tokens = sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                         "total_tokens": prompt_tokens + len(content) // 4}
+
+                if payload.get("stream"):
+                    include_usage = (payload.get("stream_options") or {}).get("include_usage")
+                    self._send_stream(content, finish_reason, payload.get("model", ""),
+                                      usage if include_usage else None)
+                    return
+
+                body = json.dumps({
+                    "id": "mock",
+                    "object": "chat.completion",
+                    "model": payload.get("model", ""),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                }).encode("utf-8")
+                self._send(200, body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockDeepSeekServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    # Point DEEPSEEK_API_URL in financial_analysis.py at the printed URL
+    server = MockDeepSeekServer(port=8008)
+    print(f"Mock DeepSeek server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,275 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
+
+import numpy as np
+
+from transcript_chunking import SPEAKER_TURN_PATTERN, split_speaker_turns, normalize_sentence
+from transcript_prefilter import YEAR_PATTERN
+
+# Paragraphs shorter than this (normalized characters) are always sent
+PARAGRAPH_MIN_CHARS = 200
+
+# Near-duplicate detection: MinHash over word shingles with LSH banding
+SHINGLE_WORDS = 3
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16                      # MINHASH_PERMUTATIONS / LSH_BANDS rows per band
+NEAR_DUPLICATE_THRESHOLD = 0.8      # Estimated Jaccard similarity to count as the same paragraph
+
+_MINHASH_PRIME = np.uint64(4294967311)          # Smallest prime above 2**32
+_permutations = np.random.RandomState(20240101)
+_MINHASH_A = _permutations.randint(1, 2 ** 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_MINHASH_B = _permutations.randint(0, 2 ** 32, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+PARAGRAPH_BREAK_PATTERN = re.compile(r"(\n[ \t]*\n\s*)")
+
+
+class Paragraph(NamedTuple):
+    turn: int       # Index of the speaker turn
+    header: str     # "Name, Title:" starting the turn (first paragraph only)
+    body: str       # Paragraph text, including its trailing line breaks
+    key: str        # normalize_sentence(body)
+
+
+def split_paragraphs(text: str) -> List[Paragraph]:
+    """
+    Split a transcript into paragraphs: blank-line separated blocks within each speaker turn.
+    join_paragraphs() of the full list gives back the text.
+    """
+    paragraphs = []
+    for turn_index, turn in enumerate(split_speaker_turns(text)):
+        header = ""
+        match = SPEAKER_TURN_PATTERN.match(turn)
+        if match:
+            header, turn = turn[:match.end()], turn[match.end():]
+
+        parts = PARAGRAPH_BREAK_PATTERN.split(turn)
+        # [block, break, block, break, ...]: keep each break with the block before it
+        blocks = ["".join(parts[i:i + 2]) for i in range(0, len(parts), 2)]
+        for i, block in enumerate(blocks):
+            if block or i == 0:
+                paragraphs.append(Paragraph(turn_index, header if i == 0 else "", block, normalize_sentence(block)))
+    return paragraphs
+
+
+def join_paragraphs(paragraphs: List[Paragraph], headers: Dict[int, str]) -> str:
+    """
+    Rebuild text from the kept paragraphs; each turn with a kept paragraph keeps its speaker header.
+    """
+    parts = []
+    previous_turn = None
+    for paragraph in paragraphs:
+        if paragraph.turn != previous_turn:
+            header = headers.get(paragraph.turn, "")
+            # The paragraph under the header may have been removed
+            parts.append(header + "\n" if header and not paragraph.header and not paragraph.body[:1].isspace() else header)
+            previous_turn = paragraph.turn
+        parts.append(paragraph.body)
+    return "".join(parts)
+
+
+def minhash_signature(key: str) -> np.ndarray:
+    """
+    MinHash signature of a normalized paragraph over SHINGLE_WORDS-word shingles.
+    """
+    words = key.split()
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                       for s in shingles], dtype=np.uint64)
+    return ((hashes[:, None] * _MINHASH_A + _MINHASH_B) % _MINHASH_PRIME).min(axis=0)
+
+
+def _bands(signature: np.ndarray) -> List[str]:
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    return [f"{band}:{signature[band * rows:(band + 1) * rows].tobytes().hex()}" for band in range(LSH_BANDS)]
+
+
+def transcript_source(text: str) -> str:
+    """
+    Identity of a transcript in the index: a hash of the full text passed to strip().
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ParagraphIndex:
+    """
+    Persistent index of transcript paragraphs already sent for extraction and
+    the statements extracted from them, shared by all transcripts and threads.
+
+    Before a request is built, paragraphs seen before are removed from the
+    text: an exact repeat is answered with the statements recorded for it, and
+    a near-duplicate (MinHash estimate of at least `threshold`) of a paragraph
+    that yielded no statements is dropped. Safe-harbor statements, operator
+    scripts and recurring framing are therefore sent once.
+
+    Entries are scoped by `version` (the extraction prompt and model), and
+    paragraphs mentioning a year only match within the same call year, since
+    whether they are forward-looking depends on the call date. Each entry
+    remembers the transcripts it was recorded from, and a transcript is never
+    stripped of its own paragraphs, so re-extracting it sends the same text
+    (and hits the response cache) instead of a text shrunk by its first run.
+
+    Args:
+        db_path (str): Path to the SQLite database
+        version (str): Identifier of the extraction prompt and model
+        min_chars (int): Shorter paragraphs are neither indexed nor removed
+        threshold (float): Similarity above which a paragraph counts as a near-duplicate
+    """
+
+    def __init__(self, db_path: str, version: str, min_chars: int = PARAGRAPH_MIN_CHARS,
+                 threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.db_path = db_path
+        self.version = version
+        self.min_chars = min_chars
+        self.threshold = threshold
+        self.savings: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS paragraphs (
+                fingerprint TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                statements TEXT NOT NULL,
+                chars INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (fingerprint, scope)
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                fingerprint TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (fingerprint, scope, source)
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (band, scope, fingerprint)
+            );
+        """)
+        self._conn.commit()
+
+    # Entry not recorded from the transcript being stripped (entries of older indexes have no sources)
+    _OTHER_SOURCE = ("NOT EXISTS (SELECT 1 FROM sources s "
+                     "WHERE s.fingerprint = p.fingerprint AND s.scope = p.scope AND s.source = ?)")
+
+    def _scope(self, paragraph: Paragraph, call_year: int) -> str:
+        return f"{self.version}:{call_year if YEAR_PATTERN.search(paragraph.key) else ''}"
+
+    def _near_duplicate(self, signature: np.ndarray, scope: str, source: str) -> bool:
+        # Only paragraphs known to yield nothing are dropped on a near match
+        fingerprints = set()
+        for band in _bands(signature):
+            fingerprints.update(row[0] for row in self._conn.execute(
+                "SELECT fingerprint FROM bands WHERE band = ? AND scope = ?", (band, scope)))
+        for fingerprint in fingerprints:
+            row = self._conn.execute(
+                f"SELECT signature FROM paragraphs p WHERE fingerprint = ? AND scope = ? AND statements = '[]' "
+                f"AND {self._OTHER_SOURCE}", (fingerprint, scope, source)).fetchone()
+            if row is not None:
+                similarity = float(np.mean(np.frombuffer(row[0], dtype=np.uint64) == signature))
+                if similarity >= self.threshold:
+                    return True
+        return False
+
+    def strip(self, text: str, ticker: str = "", call_year: int = 0
+              ) -> Tuple[str, List[Dict[str, Any]], List[Tuple[Paragraph, Optional[str], str]]]:
+        """
+        Remove paragraphs known from other transcripts before a transcript is sent.
+
+        Returns:
+            tuple: (text to send, statements recorded for the removed paragraphs,
+                    (paragraph, scope, source) of every paragraph still sent, for
+                    record(); scope is None for paragraphs too short to index)
+        """
+        source = transcript_source(text)
+        paragraphs = split_paragraphs(text)
+        headers = {paragraph.turn: paragraph.header for paragraph in paragraphs if paragraph.header}
+        kept, reused, sent = [], [], []
+        saved_paragraphs = saved_bytes = 0
+
+        with self._lock:
+            for paragraph in paragraphs:
+                if len(paragraph.key) < self.min_chars:
+                    kept.append(paragraph)
+                    sent.append((paragraph, None, source))
+                    continue
+                scope = self._scope(paragraph, call_year)
+                fingerprint = hashlib.sha256(paragraph.key.encode("utf-8")).hexdigest()
+                row = self._conn.execute(
+                    f"SELECT statements FROM paragraphs p WHERE fingerprint = ? AND scope = ? AND {self._OTHER_SOURCE}",
+                    (fingerprint, scope, source)).fetchone()
+                if row is not None:
+                    reused.extend(json.loads(row[0]))
+                elif not self._near_duplicate(minhash_signature(paragraph.key), scope, source):
+                    kept.append(paragraph)
+                    sent.append((paragraph, scope, source))
+                    continue
+                saved_paragraphs += 1
+                saved_bytes += len(paragraph.body.encode("utf-8"))
+
+        if saved_paragraphs:
+            with self._lock:
+                totals = self.savings.setdefault(ticker, {"paragraphs": 0, "bytes": 0, "tokens": 0})
+                totals["paragraphs"] += saved_paragraphs
+                totals["bytes"] += saved_bytes
+                # Same ~4 bytes per token estimate as the rate limiter
+                totals["tokens"] += saved_bytes // 4
+        if len(kept) == len(paragraphs):
+            return text, reused, sent
+        return join_paragraphs(kept, headers), reused, sent
+
+    def record(self, sent: List[Tuple[Paragraph, Optional[str], str]], statements: List[Dict[str, Any]]) -> bool:
+        """
+        Store the statements extracted from each sent paragraph.
+
+        Nothing is stored unless every statement's sentence is found in a sent
+        paragraph, so a paragraph is never recorded as empty because the model
+        paraphrased a sentence taken from it. Call only with the statements of
+        a complete (not truncated) response.
+
+        Returns:
+            bool: True if the paragraphs were stored
+        """
+        by_paragraph: List[List[Dict[str, Any]]] = [[] for _ in sent]
+        for statement in statements:
+            sentence = normalize_sentence(str(statement.get("sentence", "")))
+            match = next((i for i, (paragraph, _, _) in enumerate(sent) if sentence and sentence in paragraph.key), None)
+            if match is None:
+                return False
+            by_paragraph[match].append(statement)
+
+        now = time.time()
+        with self._lock, self._conn:
+            for (paragraph, scope, source), found in zip(sent, by_paragraph):
+                if scope is None:
+                    continue
+                fingerprint = hashlib.sha256(paragraph.key.encode("utf-8")).hexdigest()
+                signature = minhash_signature(paragraph.key)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO paragraphs (fingerprint, scope, signature, statements, chars, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint, scope, signature.tobytes(), json.dumps(found, ensure_ascii=False),
+                     len(paragraph.key), now))
+                self._conn.execute("INSERT OR IGNORE INTO sources (fingerprint, scope, source) VALUES (?, ?, ?)",
+                                   (fingerprint, scope, source))
+                if not found:
+                    self._conn.executemany("INSERT OR IGNORE INTO bands (band, scope, fingerprint) VALUES (?, ?, ?)",
+                                           [(band, scope, fingerprint) for band in _bands(signature)])
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM paragraphs").fetchone()[0]
+            return {"entries": entries, "savings": {ticker: dict(totals) for ticker, totals in self.savings.items()}}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
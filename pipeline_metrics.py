@@ -0,0 +1,216 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+# JSON-lines log of per-file, per-run and consolidation metrics; None to disable
+METRICS_LOG_PATH = "pipeline_metrics.jsonl"
+
+# Counters kept per file and exported as pipeline_<name>_total
+COUNTER_HELP = {
+    "requests": "DeepSeek API requests, not counting retries",
+    "retries": "DeepSeek API retries",
+    "api_failures": "DeepSeek API requests that failed after all retries",
+    "prompt_tokens": "Prompt tokens reported by the API",
+    "completion_tokens": "Completion tokens reported by the API",
+    "cache_hits": "Responses served from the response cache",
+    "parse_failures": "Completions or statements that could not be parsed",
+    "truncated_completions": "Completions cut off at max_tokens",
+    "statements": "Forward-looking statements extracted",
+    "value_corrections": "Metric values changed by local value normalization",
+    "dedup_tokens_saved": "Estimated prompt tokens of repeated paragraphs not sent",
+}
+
+_local = threading.local()
+
+
+class FileRecord:
+    """
+    Stage timings and counters of one unit of work (a transcript or a packed group).
+
+    A record is made current for a thread with active(); timed() and count()
+    then update it as well as the process-wide registry.
+    """
+
+    def __init__(self):
+        self.stage_seconds: Dict[str, float] = {}
+        self.counts: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def add(self, name: str, value: float = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    @contextmanager
+    def active(self):
+        previous = getattr(_local, "record", None)
+        _local.record = self
+        try:
+            yield self
+        finally:
+            _local.record = previous
+
+    def as_dict(self, share: float = 1.0) -> Dict[str, Any]:
+        """
+        Flat dict for the JSON log; share scales the counts of a request shared by several files.
+        """
+        with self._lock:
+            data = {f"{stage}_seconds": round(seconds, 4) for stage, seconds in self.stage_seconds.items()}
+            for name, value in self.counts.items():
+                data[name] = round(value * share, 2) if share != 1.0 else value
+        data["elapsed_seconds"] = round(time.perf_counter() - self.started, 4)
+        return data
+
+
+class PipelineMetrics:
+    """
+    Process-wide counters and stage timings, rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {name: 0 for name in COUNTER_HELP}
+        self.files: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def file_finished(self, status: str, statements: int):
+        with self._lock:
+            self.files[status] = self.files.get(status, 0) + 1
+            self.counters["statements"] = self.counters.get("statements", 0) + statements
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stage_seconds": {stage: round(seconds, 4) for stage, seconds in self.stage_seconds.items()},
+                "stage_calls": dict(self.stage_calls),
+                "counters": dict(self.counters),
+                "files": dict(self.files),
+            }
+
+    def render_prometheus(self, client_stats: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Prometheus text exposition; client_stats (DeepSeekClient.stats()) adds API latency quantiles.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP pipeline_stage_seconds Time spent per pipeline stage",
+            "# TYPE pipeline_stage_seconds summary",
+        ]
+        for stage, seconds in sorted(snapshot["stage_seconds"].items()):
+            lines.append(f'pipeline_stage_seconds_sum{{stage="{stage}"}} {seconds}')
+            lines.append(f'pipeline_stage_seconds_count{{stage="{stage}"}} {snapshot["stage_calls"][stage]}')
+
+        lines += [
+            "# HELP pipeline_files_total Transcript files finished, by status",
+            "# TYPE pipeline_files_total counter",
+        ]
+        for status, count in sorted(snapshot["files"].items()):
+            lines.append(f'pipeline_files_total{{status="{status}"}} {count}')
+
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# HELP pipeline_{name}_total {COUNTER_HELP.get(name, name)}")
+            lines.append(f"# TYPE pipeline_{name}_total counter")
+            lines.append(f"pipeline_{name}_total {value:g}")
+
+        if client_stats and "latency_p50" in client_stats:
+            lines += [
+                "# HELP pipeline_api_latency_seconds DeepSeek API latency until response headers",
+                "# TYPE pipeline_api_latency_seconds summary",
+            ]
+            for quantile in ("50", "95", "99"):
+                lines.append(f'pipeline_api_latency_seconds{{quantile="0.{quantile}"}} '
+                             f'{client_stats[f"latency_p{quantile}"]:.4f}')
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = PipelineMetrics()
+_log_lock = threading.Lock()
+
+
+def current_record() -> Optional[FileRecord]:
+    return getattr(_local, "record", None)
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    Wrap fn so it runs with the caller's current record, e.g. in a nested thread pool.
+    """
+    record = current_record()
+    if record is None:
+        return fn
+
+    def run(*args, **kwargs):
+        with record.active():
+            return fn(*args, **kwargs)
+    return run
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a block as the given stage in the registry and the current record.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(stage, time.perf_counter() - start)
+
+
+def add_time(stage: str, seconds: float):
+    METRICS.observe(stage, seconds)
+    record = current_record()
+    if record is not None:
+        record.add_time(stage, seconds)
+
+
+def count(name: str, value: float = 1):
+    METRICS.increment(name, value)
+    record = current_record()
+    if record is not None:
+        record.add(name, value)
+
+
+def log_event(event: str, **fields):
+    """
+    Append one JSON line to METRICS_LOG_PATH (if set).
+    """
+    if not METRICS_LOG_PATH:
+        return
+    line = json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "event": event, **fields})
+    with _log_lock:
+        with open(METRICS_LOG_PATH, "a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+def log_file(file_path: str, record: FileRecord, status: str, statements: int,
+             share: float = 1.0, error: str = ""):
+    """
+    Count a finished file and log its record; share is 1/n for a request packed with n files.
+    """
+    METRICS.file_finished(status, statements)
+    fields = record.as_dict(share)
+    fields["statements"] = statements
+    if share != 1.0:
+        fields["packed_files"] = round(1 / share)
+    if error:
+        fields["error"] = error
+    log_event("file", file=file_path, status=status, **fields)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills continuously
+    at `refill_per_second`. Not thread-safe on its own; RateLimiter guards it.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.last_refill = now
+
+    def wait_time(self, amount: float) -> float:
+        # Seconds until `amount` tokens are available (0 if available now)
+        deficit = amount - self.tokens
+        if deficit <= 0:
+            return 0.0
+        return deficit / self.refill_per_second
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter enforcing both a requests-per-minute and a
+    tokens-per-minute budget, shared by all extraction workers.
+
+    Args:
+        requests_per_minute (float): Maximum API requests per minute
+        tokens_per_minute (float): Maximum prompt + completion tokens per minute
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request and `tokens` tokens fit in the budget.
+
+        Returns:
+            float: Total seconds spent waiting
+        """
+        # A single request larger than the whole bucket would otherwise wait forever
+        tokens = min(float(tokens), self.token_bucket.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.request_bucket.refill(now)
+                self.token_bucket.refill(now)
+
+                wait = max(self.request_bucket.wait_time(1),
+                           self.token_bucket.wait_time(tokens))
+                if wait <= 0:
+                    self.request_bucket.tokens -= 1
+                    self.token_bucket.tokens -= tokens
+                    return waited
+
+            time.sleep(wait)
+            waited += wait
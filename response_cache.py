@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """
+    Content-addressed key for an API request: SHA-256 over the model, the full
+    messages (prompt template + transcript text) and the generation parameters.
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of parsed DeepSeek responses, safe to share between threads.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        max_bytes (int): Evict least recently used entries once stored responses exceed this size
+        max_age_seconds (float): Entries older than this are treated as misses and evicted
+        bypass (bool): Skip lookups (always call the API) but still store fresh responses
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024,
+                 max_age_seconds: float = 90 * 24 * 3600, bypass: bool = False):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.prune()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            now = time.time()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        data = json.dumps(response, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._total_bytes -= old[0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now)
+            )
+            self._conn.commit()
+            self._total_bytes += size
+
+        if self._total_bytes > self.max_bytes:
+            self.prune()
+
+    def prune(self):
+        """
+        Drop expired entries, then least recently used ones until under max_bytes.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?",
+                               (time.time() - self.max_age_seconds,))
+
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if self._total_bytes > self.max_bytes:
+                excess = self._total_bytes - self.max_bytes
+                freed = 0
+                evict = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                    if freed >= excess:
+                        break
+                    evict.append((key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+                self._total_bytes -= freed
+
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": entries, "bytes": self._total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,247 @@
+import os
+import csv
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from metric_normalization import METRIC_UNITS, parse_metric_value
+
+MONTH_NUMBERS = {month: i for i, month in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+# Raw metric columns, in US_GAAP_FINANCIAL_METRICS order
+METRIC_COLUMNS = list(METRIC_UNITS)
+
+ROW_COLUMNS = ["filename", "ticker", "exchange", "year", "month", "day", "call_date",
+               "financial_category", "sentence", "value", "unit", *METRIC_COLUMNS,
+               "speaker", "extraction_date"]
+
+# Rows per transaction when importing an existing CSV
+IMPORT_BATCH_ROWS = 50_000
+
+MAX_PAGE_SIZE = 1000
+
+
+def call_date_of(row: Dict[str, Any]) -> Optional[str]:
+    """
+    ISO call date (YYYY-MM-DD) from a row's year, month abbreviation and day, or None.
+    """
+    try:
+        return f"{int(row['year']):04d}-{MONTH_NUMBERS[str(row['month'])]:02d}-{int(row['day']):02d}"
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _to_record(row: Dict[str, Any]) -> Tuple:
+    # Extraction CSV row -> statements table values, in ROW_COLUMNS order
+    category = row.get("financial_category") or ""
+    value, unit = parse_metric_value(str(row.get(category) or ""), category) if category in METRIC_UNITS else (None, "")
+    record = {
+        "filename": row.get("filename", ""),
+        "ticker": row.get("ticker", ""),
+        "exchange": row.get("exchange", ""),
+        "year": int(row["year"]) if str(row.get("year", "")).isdigit() else None,
+        "month": row.get("month", ""),
+        "day": int(row["day"]) if str(row.get("day", "")).isdigit() else None,
+        # Empty rather than NULL so keyset comparisons cover every row
+        "call_date": call_date_of(row) or "",
+        "financial_category": category,
+        "sentence": row.get("forward_looking_sentence", ""),
+        "value": value,
+        "unit": unit or None,
+        "speaker": row.get("speaker", ""),
+        "extraction_date": row.get("extraction_date", ""),
+    }
+    for metric in METRIC_COLUMNS:
+        record[metric] = "" if row.get(metric) is None else str(row.get(metric))
+    return tuple(record[column] for column in ROW_COLUMNS)
+
+
+class ResultsStore:
+    """
+    Indexed SQLite store of extracted statements.
+
+    Rows are stored per transcript file: writing a file's rows replaces any
+    rows stored for it before, in one transaction, so re-extracting a changed
+    transcript never duplicates statements. Files are identified by absolute
+    path, so transcripts with the same name in different subdirectories are
+    kept apart; rows imported from a CSV, which has no paths, are keyed by
+    filename and replaced by the next extraction of a file with that name. Queries filter on indexed ticker,
+    exchange, financial_category and call date and page with a keyset cursor,
+    so their cost does not grow with the page number or the table size.
+
+    Args:
+        db_path (str): Path to the SQLite database
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        metric_columns = ",\n".join(f"{metric} TEXT" for metric in METRIC_COLUMNS)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS statements (
+                id INTEGER PRIMARY KEY,
+                filename TEXT NOT NULL,
+                ticker TEXT,
+                exchange TEXT,
+                year INTEGER,
+                month TEXT,
+                day INTEGER,
+                call_date TEXT,
+                financial_category TEXT,
+                sentence TEXT,
+                value REAL,
+                unit TEXT,
+                {metric_columns},
+                speaker TEXT,
+                extraction_date TEXT,
+                path TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_statements_ticker ON statements (ticker, call_date, id);
+            CREATE INDEX IF NOT EXISTS idx_statements_category ON statements (financial_category, call_date, id);
+            CREATE INDEX IF NOT EXISTS idx_statements_ticker_category
+                ON statements (ticker, financial_category, call_date, id);
+            CREATE INDEX IF NOT EXISTS idx_statements_exchange ON statements (exchange, call_date, id);
+            CREATE INDEX IF NOT EXISTS idx_statements_date ON statements (call_date, id);
+            CREATE INDEX IF NOT EXISTS idx_statements_filename ON statements (filename);
+        """)
+        # Stores created before rows were keyed by path
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(statements)")}
+        if "path" not in columns:
+            self._conn.execute("ALTER TABLE statements ADD COLUMN path TEXT")
+            self._conn.execute("UPDATE statements SET path = filename")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_statements_path ON statements (path)")
+        self._conn.commit()
+
+    def _insert(self, records: Iterable[Tuple]):
+        # records: ROW_COLUMNS values followed by the path
+        placeholders = ", ".join("?" for _ in range(len(ROW_COLUMNS) + 1))
+        self._conn.executemany(
+            f"INSERT INTO statements ({', '.join(ROW_COLUMNS)}, path) VALUES ({placeholders})", records)
+
+    def replace_file(self, file_path: str, rows: List[Dict[str, Any]]):
+        """
+        Store one transcript's rows, replacing rows previously stored for the same
+        file, and rows imported from a CSV under its filename.
+        """
+        path = os.path.abspath(file_path)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM statements WHERE path IN (?, ?)", (path, os.path.basename(file_path)))
+            self._insert((*_to_record(row), path) for row in rows)
+
+    def import_csv(self, csv_path: str, batch_rows: int = IMPORT_BATCH_ROWS) -> int:
+        """
+        Load an existing extraction CSV, replacing rows previously imported for every filename it contains.
+        Rows are inserted in transactions of `batch_rows` rows.
+
+        Returns:
+            int: Number of rows imported
+        """
+        imported = 0
+        seen = set()
+        with open(csv_path, "r", newline="", encoding="utf-8", errors="replace") as file:
+            reader = csv.DictReader(file)
+            while True:
+                batch = [row for _, row in zip(range(batch_rows), reader)]
+                if not batch:
+                    break
+                with self._lock, self._conn:
+                    new_files = {row.get("filename", "") for row in batch} - seen
+                    self._conn.executemany("DELETE FROM statements WHERE path = ?",
+                                           [(filename,) for filename in new_files])
+                    seen |= new_files
+                    self._insert((*_to_record(row), row.get("filename", "")) for row in batch)
+                imported += len(batch)
+        return imported
+
+    def rebuild_from_csv(self, csv_path: str) -> int:
+        """
+        Replace every stored row with the rows of an extraction CSV, in one
+        transaction, so queries never see a partly rebuilt store. Used when
+        the CSV was rewritten as a whole, e.g. by merging distributed shards.
+
+        Returns:
+            int: Number of rows imported
+        """
+        with open(csv_path, "r", newline="", encoding="utf-8", errors="replace") as file:
+            reader = csv.DictReader(file)
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM statements")
+                imported = 0
+                while True:
+                    batch = [row for _, row in zip(range(IMPORT_BATCH_ROWS), reader)]
+                    if not batch:
+                        break
+                    self._insert((*_to_record(row), row.get("filename", "")) for row in batch)
+                    imported += len(batch)
+        return imported
+
+    def query(self, ticker: Optional[str] = None, exchange: Optional[str] = None,
+              category: Optional[str] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None, limit: int = 100,
+              cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Statements matching the filters, newest call first.
+
+        Args:
+            ticker (str): Exact ticker
+            exchange (str): Exact exchange code
+            category (str): financial_category, e.g. "earnings_per_share"
+            date_from (str): First call date, YYYY-MM-DD (inclusive)
+            date_to (str): Last call date, YYYY-MM-DD (inclusive)
+            limit (int): Page size, at most MAX_PAGE_SIZE
+            cursor (str): next_cursor of the previous page
+
+        Returns:
+            dict: {"results": [...], "next_cursor": str or None}
+        """
+        conditions, params = [], []
+        for column, value in (("ticker", ticker), ("exchange", exchange), ("financial_category", category)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if date_from:
+            conditions.append("call_date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("call_date <= ?")
+            params.append(date_to)
+        if cursor:
+            cursor_date, cursor_id = cursor.rsplit(":", 1)
+            conditions.append("(call_date, id) < (?, ?)")
+            params += [cursor_date, int(cursor_id)]
+
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(ROW_COLUMNS)} FROM statements {where} "
+                f"ORDER BY call_date DESC, id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        results = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = results[-1]
+            next_cursor = f"{last['call_date']}:{last['id']}"
+        return {"results": results, "next_cursor": next_cursor}
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM statements LIMIT 1").fetchone() is None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def results_store_path_for(output_csv_path: str) -> str:
+    """
+    Store location for an output CSV: financial_information.csv -> financial_information.results.sqlite
+    """
+    return f"{os.path.splitext(output_csv_path)[0]}.results.sqlite"
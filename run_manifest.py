@@ -0,0 +1,234 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Status of a transcript in the manifest
+STATUS_PROCESSING = "processing"   # Extraction started, nothing written yet
+STATUS_WRITING = "writing"         # Rows are being appended to the CSV
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def file_content_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every process (and thread) using the same lock file.
+    The operating system releases it when the holding process exits, so a crashed
+    writer never leaves it held.
+
+    Args:
+        path (str): Lock file, created if missing
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._file.seek(0)
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+class RunManifest:
+    """
+    Persistent record of which transcripts have been extracted into an output CSV.
+
+    Each file is tracked by path, size, mtime, content hash and status. Before
+    rows are appended the CSV size is recorded, so a run that crashes mid-write
+    can truncate the partial rows and resume without duplicates.
+
+    Writes to the CSV go through writing(), a lock shared by every process using
+    the manifest (the command line, the web app, watch mode). recover() takes
+    the same lock, so it only ever sees writes left by a process that died, never
+    one still in progress in another process.
+
+    Args:
+        db_path (str): Path to the SQLite manifest database
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._write_lock = FileLock(f"{db_path}.lock")
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                content_hash TEXT,
+                status TEXT NOT NULL,
+                csv_offset INTEGER,
+                statements INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_status ON files (status)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.abspath(file_path)
+
+    def _get(self, file_path: str) -> Optional[Tuple]:
+        return self._conn.execute(
+            "SELECT size, mtime, content_hash, status FROM files WHERE path = ?",
+            (self._key(file_path),)
+        ).fetchone()
+
+    def needs_processing(self, file_path: str) -> bool:
+        """
+        True unless the file is recorded as done and its content is unchanged.
+        Size and mtime are checked first; the file is only hashed if they differ.
+        """
+        with self._lock:
+            row = self._get(file_path)
+        if row is None or row[3] != STATUS_DONE:
+            return True
+
+        stat = os.stat(file_path)
+        if stat.st_size == row[0] and stat.st_mtime == row[1]:
+            return False
+        if stat.st_size != row[0] or file_content_hash(file_path) != row[2]:
+            return True
+
+        # Touched but identical: remember the new mtime to skip hashing next time
+        with self._lock:
+            self._conn.execute("UPDATE files SET mtime = ? WHERE path = ?",
+                               (stat.st_mtime, self._key(file_path)))
+            self._conn.commit()
+        return False
+
+    def mark_processing(self, file_path: str):
+        # Fingerprint before reading, so later edits to the file are detected
+        stat = os.stat(file_path)
+        content_hash = file_content_hash(file_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, content_hash, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(file_path), stat.st_size, stat.st_mtime, content_hash,
+                 STATUS_PROCESSING, time.time())
+            )
+            self._conn.commit()
+
+    def _set_status(self, file_path: str, status: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        sql = f"UPDATE files SET status = ?, updated_at = ?{', ' if fields else ''}{assignments} WHERE path = ?"
+        with self._lock:
+            self._conn.execute(sql, (status, time.time(), *fields.values(), self._key(file_path)))
+            self._conn.commit()
+
+    @contextmanager
+    def writing(self, output_csv_path: str):
+        """
+        Hold the output CSV's writer lock: mark_writing(), the write and mark_done()
+        of one file happen inside it. A write left by a process that died is rolled
+        back first, so new rows are never appended after partial ones.
+        """
+        with self._write_lock:
+            self._recover(output_csv_path)
+            yield
+
+    def mark_writing(self, file_path: str, csv_offset: int):
+        self._set_status(file_path, STATUS_WRITING, csv_offset=csv_offset)
+
+    def mark_done(self, file_path: str, statements: int):
+        self._set_status(file_path, STATUS_DONE, statements=statements, error=None)
+
+    def mark_failed(self, file_path: str, error: str):
+        self._set_status(file_path, STATUS_FAILED, error=error)
+
+    def recover(self, output_csv_path: str) -> int:
+        """
+        Undo a write interrupted by a crash: truncate the CSV back to the offset
+        recorded before the write and mark that file for reprocessing.
+
+        Returns:
+            int: Number of interrupted files recovered
+        """
+        with self._write_lock:
+            return self._recover(output_csv_path)
+
+    def _recover(self, output_csv_path: str) -> int:
+        # Called with the writer lock held, so no write is in progress anywhere
+        with self._lock:
+            interrupted = self._conn.execute(
+                "SELECT path, csv_offset FROM files WHERE status = ? ORDER BY csv_offset",
+                (STATUS_WRITING,)
+            ).fetchall()
+            if not interrupted:
+                return 0
+
+            # The CSV has a single writer, so the earliest offset covers every partial write
+            offset = interrupted[0][1]
+            if os.path.exists(output_csv_path) and os.path.getsize(output_csv_path) > offset:
+                with open(output_csv_path, 'r+b') as csvfile:
+                    csvfile.truncate(offset)
+
+            self._conn.executemany(
+                "UPDATE files SET status = ?, error = ? WHERE path = ?",
+                [(STATUS_FAILED, "interrupted while writing", path) for path, _ in interrupted]
+            )
+            self._conn.commit()
+        return len(interrupted)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,116 @@
+import re
+from typing import List, Dict, Any, Tuple
+
+from transcript_chunking import normalize_sentence
+
+# Line introducing each transcript in a packed request
+FILE_MARKER = "=== FILE: {filename} ==="
+FILE_MARKER_PATTERN = re.compile(r"^=== FILE: (.+?) ===$", re.MULTILINE)
+BATCH_SEPARATOR = "\n\n"
+
+# Instructions added to the extraction prompt for a packed request
+BATCH_INSTRUCTIONS = """The transcript content contains several transcripts, each starting with a line "=== FILE: <filename> ===".
+Add a "file" field to every statement with the filename of the transcript it was taken from, and apply the future-period rule using the date in that filename.
+
+"""
+
+
+def pack_transcripts(sizes: List[Tuple[str, int]], budget: int, max_files: int) -> List[List[str]]:
+    """
+    Group transcripts into requests whose sizes add up to at most budget, with at most max_files files.
+
+    Transcripts are packed in the given order, so the same inputs always give
+    the same groups (and the same cache keys). A transcript larger than the
+    budget gets a group of its own.
+
+    Args:
+        sizes (list): (key, size) pairs, e.g. packed_size() of each transcript
+        budget (int): Maximum total size per group
+        max_files (int): Maximum transcripts per group
+
+    A group filling the character budget exactly is kept whole; one character
+    less splits it:
+
+    >>> transcripts = {f"2024-Jan-0{i}-T{i}.N-Earnings Call Transcript.txt": "x" * 4992 for i in range(1, 5)}
+    >>> sizes = [(name, packed_size(name, text)) for name, text in transcripts.items()]
+    >>> char_limit = len(format_batch(list(transcripts.items())))
+    >>> [len(group) for group in pack_transcripts(sizes, char_limit + len(BATCH_SEPARATOR), 8)]
+    [4]
+    >>> groups = pack_transcripts(sizes, char_limit - 1 + len(BATCH_SEPARATOR), 8)
+    >>> [len(group) for group in groups]
+    [3, 1]
+    >>> max(len(format_batch([(name, transcripts[name]) for name in group])) for group in groups) <= char_limit - 1
+    True
+    """
+    groups = []
+    current = []
+    current_size = 0
+
+    for key, size in sizes:
+        if current and (current_size + size > budget or len(current) >= max_files):
+            groups.append(current)
+            current, current_size = [], 0
+        current.append(key)
+        current_size += size
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def packed_size(filename: str, text: str) -> int:
+    """
+    Characters a transcript adds to format_batch(): its marker line, its text and
+    one BATCH_SEPARATOR. A group fits in char_limit characters when its sizes add
+    up to at most char_limit + len(BATCH_SEPARATOR), since the first transcript
+    has no separator.
+
+    >>> transcripts = [("A.txt", "x" * 4992), ("B.txt", "y" * 4992)]
+    >>> sum(packed_size(name, text) for name, text in transcripts) - len(BATCH_SEPARATOR)
+    10026
+    >>> len(format_batch(transcripts))
+    10026
+    """
+    return len(FILE_MARKER.format(filename=filename)) + 1 + len(text.strip()) + len(BATCH_SEPARATOR)
+
+
+def format_batch(transcripts: List[Tuple[str, str]]) -> str:
+    """
+    Join (filename, text) pairs into one transcript body, each under its FILE_MARKER line.
+    """
+    return BATCH_SEPARATOR.join(f"{FILE_MARKER.format(filename=filename)}\n{text.strip()}" for filename, text in transcripts)
+
+
+def split_batch_statements(statements: List[Dict[str, Any]],
+                           transcripts: List[Tuple[str, str]]) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+    """
+    Assign the statements of a packed response back to their transcripts.
+
+    A statement goes to the transcript named by its "file" field; if that is
+    missing or unknown, to the transcript containing its sentence. Statements
+    that match neither are dropped.
+
+    Returns:
+        tuple: ({filename: statements}, number of dropped statements)
+    """
+    by_file = {filename: [] for filename, _ in transcripts}
+    lowered = {filename.lower(): filename for filename in by_file}
+    normalized_texts = [(filename, normalize_sentence(text)) for filename, text in transcripts]
+    dropped = 0
+
+    for statement in statements:
+        statement = dict(statement)
+        tag = str(statement.pop("file", "") or "").strip()
+        filename = lowered.get(tag.lower())
+
+        if filename is None:
+            sentence = normalize_sentence(statement.get("sentence", ""))
+            if sentence:
+                filename = next((name for name, text in normalized_texts if sentence in text), None)
+
+        if filename is None:
+            dropped += 1
+        else:
+            by_file[filename].append(statement)
+
+    return by_file, dropped
@@ -0,0 +1,136 @@
+import re
+from typing import List, Dict, Any, Tuple
+
+# A speaker turn starts with a line like "John Smith, CEO:" or "Operator:"
+SPEAKER_TURN_PATTERN = re.compile(r"^[ \t]*[A-Z][A-Za-z.'&\- ]{0,60}(?:,[^:\n]{1,60})?:", re.MULTILINE)
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_speaker_turns(text: str) -> List[str]:
+    """
+    Split a transcript into speaker turns, keeping any preamble as the first turn.
+    """
+    starts = [m.start() for m in SPEAKER_TURN_PATTERN.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+
+    turns = [text[starts[i]:starts[i + 1]] for i in range(len(starts) - 1)]
+    return [turn for turn in turns if turn.strip()]
+
+
+def _split_oversized(turn: str, max_chars: int) -> List[str]:
+    # Break a turn that does not fit in one chunk on sentence boundaries
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_BOUNDARY_PATTERN.split(turn):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_transcript(text: str, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Pack speaker turns into chunks of at most `max_chars` characters.
+
+    Each chunk after the first repeats the trailing turns of the previous chunk,
+    up to `overlap_chars`, so statements that refer back to the previous
+    speaker keep their context.
+
+    Args:
+        text (str): Full transcript content
+        max_chars (int): Maximum characters per chunk
+        overlap_chars (int): Maximum characters of trailing turns repeated in the next chunk
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    # Overlap can never take up the whole chunk
+    overlap_chars = min(overlap_chars, max_chars // 2)
+
+    turns = []
+    for turn in split_speaker_turns(text):
+        if len(turn) > max_chars:
+            turns.extend(_split_oversized(turn, max_chars))
+        else:
+            turns.append(turn)
+
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+    for turn in turns:
+        if current and current_len + len(turn) > max_chars:
+            chunks.append("".join(current))
+
+            # Carry trailing turns forward as overlap
+            overlap: List[str] = []
+            overlap_len = 0
+            for previous in reversed(current):
+                if overlap_len + len(previous) > overlap_chars or overlap_len + len(previous) + len(turn) > max_chars:
+                    break
+                overlap.insert(0, previous)
+                overlap_len += len(previous)
+            current, current_len = overlap, overlap_len
+
+        current.append(turn)
+        current_len += len(turn)
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    Comparison key for a sentence: lowercase, alphanumerics only, single spaces.
+    """
+    return " ".join(re.sub(r"[^a-z0-9%.\s]", " ", sentence.lower()).split()).strip(" .")
+
+
+def merge_statements(statement_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk forward_looking_statements, dropping repeated sentences.
+
+    Chunks overlap, so the same sentence may be extracted more than once. The
+    first occurrence is kept and any field it left empty is filled from later
+    duplicates. Duplicates are matched on category and sentence, so a sentence
+    giving several metrics keeps one statement per category.
+
+    >>> both = "We expect revenue growth of 5% and a gross margin of 40% in 2025."
+    >>> chunk = [{"category": "revenue_growth", "sentence": both}, {"category": "gross_margin", "sentence": both}]
+    >>> [s["category"] for s in merge_statements([chunk, chunk])]
+    ['revenue_growth', 'gross_margin']
+    """
+    merged: List[Dict[str, Any]] = []
+    by_sentence: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for statements in statement_lists:
+        for statement in statements:
+            sentence = normalize_sentence(str(statement.get("sentence", "")))
+            if not sentence:
+                merged.append(statement)
+                continue
+            key = (str(statement.get("category") or "").strip().lower(), sentence)
+
+            existing = by_sentence.get(key)
+            if existing is None:
+                existing = dict(statement)
+                by_sentence[key] = existing
+                merged.append(existing)
+                continue
+
+            for field, value in statement.items():
+                if value not in ("", None) and existing.get(field) in ("", None):
+                    existing[field] = value
+
+    return merged
@@ -0,0 +1,147 @@
+import re
+from typing import List, Dict, Any, Tuple
+
+from transcript_chunking import SENTENCE_BOUNDARY_PATTERN, SPEAKER_TURN_PATTERN, split_speaker_turns
+
+# Phrases signalling a statement about future periods
+FORWARD_LOOKING_CUES = [
+    "expect", "anticipate", "forecast", "guidance", "guide", "outlook", "project",
+    "target", "plan", "intend", "will", "we'll", "should", "aim", "goal", "estimate",
+    "looking ahead", "look ahead", "going forward", "next year", "next quarter",
+    "next fiscal", "coming year", "remainder of the year", "rest of the year",
+    "long-term", "long term", "committed to", "on track",
+]
+
+# Keywords per US_GAAP_FINANCIAL_METRICS category
+METRIC_KEYWORDS = {
+    "revenue_growth": ["revenue", "sales", "top line", "top-line"],
+    "capital_expenditure": ["capital expenditure", "capex", "capital spending", "capital investment"],
+    "earnings_per_share": ["earnings per share", "eps", "per share"],
+    "gross_margin": ["gross margin"],
+    "operating_margin": ["operating margin", "operating income"],
+    "net_margin": ["net margin", "net income", "profit margin"],
+    "ebitda": ["ebitda"],
+    "return_on_equity": ["return on equity", "roe"],
+    "return_on_assets": ["return on assets", "roa"],
+    "debt_to_equity_ratio": ["debt-to-equity", "debt to equity", "leverage"],
+    "current_ratio": ["current ratio"],
+    "quick_ratio": ["quick ratio"],
+    "interest_coverage_ratio": ["interest coverage"],
+    "price_to_earnings_ratio": ["price-to-earnings", "price to earnings", "p/e"],
+    "dividend_yield": ["dividend", "yield", "payout"],
+}
+
+# Score weights; a sentence is a candidate once its score reaches PREFILTER_MIN_SCORE
+CUE_WEIGHT = 2
+FUTURE_YEAR_WEIGHT = 2
+METRIC_WEIGHT = 1
+NUMBER_WEIGHT = 1
+PREFILTER_MIN_SCORE = 3
+
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+NUMBER_PATTERN = re.compile(r"\d")
+
+
+def _phrase_pattern(phrases: List[str]) -> re.Pattern:
+    return re.compile(r"(?<![a-z])(?:" + "|".join(re.escape(p) for p in phrases) + r")", re.IGNORECASE)
+
+
+CUE_PATTERN = _phrase_pattern(FORWARD_LOOKING_CUES)
+METRIC_PATTERN = _phrase_pattern([k for keywords in METRIC_KEYWORDS.values() for k in keywords])
+
+
+def score_sentence(sentence: str, call_year: int = 0) -> int:
+    """
+    Score how likely a sentence carries forward-looking metric guidance.
+
+    Args:
+        sentence (str): Sentence text
+        call_year (int): Year of the earnings call; mentions of this year or later count as future
+    """
+    score = 0
+    if CUE_PATTERN.search(sentence):
+        score += CUE_WEIGHT
+    if call_year and any(int(y) >= call_year for y in YEAR_PATTERN.findall(sentence)):
+        score += FUTURE_YEAR_WEIGHT
+    if METRIC_PATTERN.search(sentence):
+        score += METRIC_WEIGHT
+    # Years alone are not values
+    if NUMBER_PATTERN.search(YEAR_PATTERN.sub("", sentence)):
+        score += NUMBER_WEIGHT
+    return score
+
+
+def _split_turn(turn: str) -> Tuple[str, List[str]]:
+    # Separate the "Name, Title:" header from the sentences of a speaker turn
+    header = ""
+    match = SPEAKER_TURN_PATTERN.match(turn)
+    if match:
+        header = match.group().strip()
+        turn = turn[match.end():]
+    # Join wrapped lines; boundaries need whitespace after the stop so "2.5%" stays intact
+    sentences = [s for s in SENTENCE_BOUNDARY_PATTERN.split(" ".join(turn.split())) if s]
+    return header, sentences
+
+
+def prefilter_transcript(text: str, call_year: int = 0,
+                         context_sentences: int = 1) -> Tuple[str, Dict[str, Any]]:
+    """
+    Reduce a transcript to candidate forward-looking sentences before the LLM call.
+
+    Each candidate is kept together with `context_sentences` neighbours from the
+    same speaker turn, and the speaker header of every turn with a candidate is
+    preserved so the model can still attribute statements.
+
+    Args:
+        text (str): Full transcript content
+        call_year (int): Year of the earnings call, 0 if unknown
+        context_sentences (int): Neighbouring sentences kept on each side of a candidate
+
+    Returns:
+        tuple: (filtered text, statistics dict with sentence and token counts)
+    """
+    kept_turns = []
+    total_sentences = 0
+    candidate_sentences = 0
+    kept_sentences = 0
+
+    for turn in split_speaker_turns(text):
+        header, sentences = _split_turn(turn)
+        total_sentences += len(sentences)
+
+        keep = set()
+        for i, sentence in enumerate(sentences):
+            if score_sentence(sentence, call_year) >= PREFILTER_MIN_SCORE:
+                candidate_sentences += 1
+                keep.update(range(max(0, i - context_sentences),
+                                  min(len(sentences), i + context_sentences + 1)))
+        if not keep:
+            continue
+
+        # Mark gaps so the model does not read non-adjacent sentences as one passage
+        parts = []
+        previous = -1
+        for i in sorted(keep):
+            if parts and i != previous + 1:
+                parts.append("[...]")
+            parts.append(sentences[i])
+            previous = i
+        kept_sentences += len(keep)
+
+        body = " ".join(parts)
+        kept_turns.append(f"{header}\n{body}" if header else body)
+
+    filtered = "\n\n".join(kept_turns)
+
+    # Same ~4 characters per token estimate as the rate limiter
+    original_tokens = len(text) // 4 + 1
+    filtered_tokens = len(filtered) // 4 + 1 if filtered else 0
+    stats = {
+        "total_sentences": total_sentences,
+        "candidate_sentences": candidate_sentences,
+        "kept_sentences": kept_sentences,
+        "original_tokens": original_tokens,
+        "filtered_tokens": filtered_tokens,
+        "token_reduction": 1 - filtered_tokens / original_tokens,
+    }
+    return filtered, stats
@@ -0,0 +1,250 @@
+import os
+import time
+import threading
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+try:
+    # inotify on Linux, FSEvents on macOS, ReadDirectoryChangesW on Windows
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Watch mode configuration
+WATCH_SETTLE_SECONDS = 2.0      # A file must keep the same size and mtime this long before it is extracted
+WATCH_POLL_SECONDS = 5.0        # Rescan interval without filesystem events (polling fallback)
+WATCH_RESCAN_SECONDS = 300.0    # Safety rescan interval with filesystem events, for dropped events
+
+
+def is_transcript_file(filename: str) -> bool:
+    return filename.endswith('.txt') and 'Transcript' in filename
+
+
+def scan_transcripts(directory_path: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Recursively yield (path, stat) for every transcript file under a directory.
+    Uses os.scandir, so no extra stat call is needed to tell files from directories.
+    """
+    pending = [directory_path]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and is_transcript_file(entry.name):
+                        yield entry.path, entry.stat()
+                except OSError:
+                    # Removed while scanning
+                    continue
+
+
+class _EventHandler(FileSystemEventHandler):
+    # Forwards created, modified and moved-in paths to the watcher
+
+    def __init__(self, watcher: "TranscriptWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            # A directory moved in arrives as a single event; scan it
+            if event.event_type in ("created", "moved"):
+                self.watcher.request_rescan()
+            return
+        path = getattr(event, "dest_path", "") or event.src_path
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        if is_transcript_file(os.path.basename(path)):
+            self.watcher.notify(path)
+
+
+class TranscriptWatcher:
+    """
+    Watch a directory tree and hand over each transcript once it is fully written.
+
+    Changes are picked up from filesystem events when watchdog is installed,
+    otherwise by rescanning every `poll_seconds`. A new or changed file is only
+    passed to `on_ready` after its size and mtime have stayed the same for
+    `settle_seconds`, so transcripts still being copied or downloaded are not
+    read half-written. A file is handed over again only if it changes later.
+
+    Args:
+        directory_path (str): Directory to watch, including subdirectories
+        on_ready (callable): Called with the path of each settled transcript
+        settle_seconds (float): Quiet period required before a file is handed over
+        poll_seconds (float): Rescan interval when filesystem events are unavailable
+        use_events (bool): Use filesystem events if watchdog is installed
+    """
+
+    def __init__(self, directory_path: str, on_ready: Callable[[str], None],
+                 settle_seconds: float = WATCH_SETTLE_SECONDS, poll_seconds: float = WATCH_POLL_SECONDS,
+                 use_events: bool = True):
+        self.directory_path = directory_path
+        self.on_ready = on_ready
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.use_events = use_events and Observer is not None
+
+        # path -> (size, mtime, time the signature was first seen)
+        self.pending: Dict[str, Tuple[int, float, float]] = {}
+        # path -> (size, mtime) handed to on_ready
+        self.handed_over: Dict[str, Tuple[int, float]] = {}
+
+        self._notified: Set[str] = set()
+        self._rescan = True
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def notify(self, path: str):
+        """
+        Mark a path as possibly changed (called from the event thread).
+        """
+        with self._lock:
+            self._notified.add(path)
+        self._wakeup.set()
+
+    def request_rescan(self):
+        with self._lock:
+            self._rescan = True
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _observe(self, path: str, stat: Optional[os.stat_result], now: float):
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Deleted or renamed away before it settled
+                self.pending.pop(path, None)
+                return
+
+        signature = (stat.st_size, stat.st_mtime)
+        if self.handed_over.get(path) == signature:
+            self.pending.pop(path, None)
+            return
+        previous = self.pending.get(path)
+        if previous is None or previous[:2] != signature:
+            self.pending[path] = (*signature, now)
+
+    def _hand_over_settled(self, now: float):
+        for path, (size, mtime, since) in list(self.pending.items()):
+            if now - since < self.settle_seconds:
+                continue
+            # Confirm nothing was written since the signature was recorded
+            self._observe(path, None, now)
+            if self.pending.get(path) != (size, mtime, since):
+                continue
+            del self.pending[path]
+            self.handed_over[path] = (size, mtime)
+            try:
+                self.on_ready(path)
+            except Exception as e:
+                print(f"Could not queue {path}: {e}")
+
+    def _next_wait(self, now: float, next_scan: float) -> float:
+        wait = next_scan - now
+        if self.pending:
+            wait = min(wait, min(since for _, _, since in self.pending.values()) + self.settle_seconds - now)
+        return max(0.05, wait)
+
+    def run(self):
+        """
+        Watch until stop() is called or the process is interrupted.
+        """
+        observer = None
+        if self.use_events:
+            observer = Observer()
+            observer.schedule(_EventHandler(self), self.directory_path, recursive=True)
+            observer.start()
+        scan_interval = WATCH_RESCAN_SECONDS if observer is not None else self.poll_seconds
+        print(f"Watching {self.directory_path} for transcripts "
+              f"({'filesystem events' if observer is not None else f'polling every {self.poll_seconds:g}s'})")
+
+        next_scan = 0.0
+        try:
+            while not self._stopped.is_set():
+                # Cleared before draining, so a notify() after this point wakes the next wait
+                self._wakeup.clear()
+                now = time.monotonic()
+                with self._lock:
+                    notified, self._notified = self._notified, set()
+                    rescan, self._rescan = self._rescan, False
+
+                if rescan or now >= next_scan:
+                    for path, stat in scan_transcripts(self.directory_path):
+                        self._observe(path, stat, now)
+                    next_scan = now + scan_interval
+                for path in notified:
+                    self._observe(path, None, now)
+
+                self._hand_over_settled(now)
+
+                self._wakeup.wait(self._next_wait(time.monotonic(), next_scan))
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+def watch_transcripts(directory_path: str, output_csv_path: str, max_workers: Optional[int] = None,
+                      settle_seconds: float = WATCH_SETTLE_SECONDS, poll_seconds: float = WATCH_POLL_SECONDS):
+    """
+    Long-running alternative to process_all_transcripts: extract every transcript
+    under directory_path as soon as it has been written, until interrupted.
+
+    Existing files are handled on start-up; with the manifest enabled, those
+    already extracted and unchanged are skipped.
+    """
+    # Imported here so financial_analysis can use scan_transcripts without a cycle
+    import financial_analysis
+    from extraction_jobs import ExtractionJobQueue
+
+    if not os.path.isdir(directory_path):
+        print(f"Directory not found: {directory_path}")
+        return
+
+    job_queue = ExtractionJobQueue(output_csv_path, max_workers or financial_analysis.MAX_WORKERS)
+    events = job_queue.subscribe()
+
+    def report():
+        # Print per-file results from the job queue's progress events
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            if event.get("type") == "file" and event["status"] in ("done", "failed", "skipped"):
+                detail = f"{event['statements']} statements" if event["status"] == "done" else event["error"]
+                print(f"{event['status'].capitalize()}: {event['file']} {detail}".rstrip())
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+
+    watcher = TranscriptWatcher(directory_path, lambda path: job_queue.submit([path]),
+                                settle_seconds=settle_seconds, poll_seconds=poll_seconds)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("Stopping watch mode; waiting for running extractions")
+    finally:
+        job_queue.shutdown(wait=True)
+        job_queue.unsubscribe(events)
+        events.put(None)
+        reporter.join()
+
+
+if __name__ == "__main__":
+    # Same locations as financial_analysis.py; stop with Ctrl+C
+    TRANSCRIPT_DIR = r"data_source"
+    OUTPUT_CSV = r"financial_information.csv"
+
+    watch_transcripts(TRANSCRIPT_DIR, OUTPUT_CSV)
@@ -0,0 +1,343 @@
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
+
+from metric_normalization import METRIC_UNITS, SCALE_WORDS, UNIT_PERCENT, UNIT_CURRENCY, UNIT_RATIO, parse_metric_value
+
+NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+"
+PERCENT = r"\s?%|\s*percent\b|\s*per\s+cent\b"
+BASIS_POINTS = r"\s*(?:basis\s+points?|bps|bp)\b"
+SCALE = rf"\s*(?:{'|'.join(sorted(SCALE_WORDS, key=len, reverse=True))})\b"
+CURRENCY = r"[$€£¥]"
+
+# One value or range: "approximately $2.5 billion", "2% to 5%", "between 1.2 and 1.4 billion",
+# "from 5% to 7%", "1.5 to 1", "8x", "50 basis points". Matched against lowercased text.
+VALUE_PATTERN = re.compile(
+    rf"(?P<between>\bbetween\s+)?(?P<from>\bfrom\s+)?"
+    rf"(?<![\w.])(?P<sign1>[-−](?=\s*(?:{CURRENCY}\s*)?\d))?(?P<cur1>{CURRENCY})?\s*(?P<a>{NUMBER})"
+    rf"(?:(?P<pct1>{PERCENT})|(?P<bps1>{BASIS_POINTS}))?(?P<scale1>{SCALE})?"
+    rf"(?:\s*(?P<sep>(?(between)and|(?:to|-|–|—|:)))\s*"
+    rf"(?P<sign2>[-−])?(?P<cur2>{CURRENCY})?\s*(?P<b>{NUMBER})"
+    rf"(?:(?P<pct2>{PERCENT})|(?P<bps2>{BASIS_POINTS}))?(?P<scale2>{SCALE})?)?"
+    rf"(?P<times>\s*(?:x|times)\b)?"
+)
+
+# Modifiers allowed between a change word and its number
+MODIFIERS = (r"approximately|about|around|roughly|nearly|almost|some|over|under|up\s+to|"
+             r"more\s+than|less\s+than|close\s+to|an?|another|further|additional|an\s+additional")
+
+# Sign semantics: a percentage governed by "decrease by", "decline of", "down" etc. is negative.
+# Only modifiers may stand between the word and the number, so "lower costs ... margin of 25%"
+# keeps its sign, and "declining to 25%" is a level, not a change.
+DECLINE_WORDS = r"declin\w*|decreas\w*|down|drop\w*|fall\w*|fell|lower\w*|reduc\w*|contract\w*|shrink\w*|negative|compress\w*"
+DECLINE_BEFORE_PATTERN = re.compile(rf"\b(?:{DECLINE_WORDS})\s+(?:(?:by|of)\s+)?(?:(?:{MODIFIERS})\s+)*$")
+DECLINE_AFTER_PATTERN = re.compile(rf"^\s*(?:{DECLINE_WORDS})\b")
+DECLINE_CONTEXT_CHARS = 60
+
+# "X to Y" after a change word or "by" is a change followed by the resulting level
+# ("increase 10% to $3.50", "decrease by $50 million to $450 million"), not a range
+CHANGE_WORDS = (rf"increas\w*|ris(?:e|es|ing)|rose|grow(?:s|ing)?|grew|expand\w*|improv\w*|rais\w*|"
+                rf"lift\w*|climb\w*|up|{DECLINE_WORDS}")
+CHANGE_BEFORE_PATTERN = re.compile(rf"(?:\b(?:{CHANGE_WORDS})\s+(?:(?:by|of)\s+)?|\bby\s+)(?:(?:{MODIFIERS})\s+)*$")
+
+RELATIVE_TOLERANCE = 1e-6
+
+# Words naming each metric in a sentence; a value belongs to the metric named closest before it
+METRIC_KEYWORDS = {
+    "revenue_growth": r"revenues?|sales|top[-\s]line",
+    "capital_expenditure": r"capex|capital\s+expenditures?|capital\s+spending",
+    "earnings_per_share": r"eps|earnings\s+per\s+share",
+    "gross_margin": r"gross\s+margins?",
+    "operating_margin": r"operating\s+margins?",
+    "net_margin": r"net\s+(?:profit\s+)?margins?",
+    "ebitda": r"ebitda(?!\s+margin)",
+    "return_on_equity": r"return\s+on\s+equity|roe",
+    "return_on_assets": r"return\s+on\s+assets|roa",
+    "debt_to_equity_ratio": r"debt[-\s]to[-\s]equity|leverage",
+    "current_ratio": r"current\s+ratio",
+    "quick_ratio": r"quick\s+ratio",
+    "interest_coverage_ratio": r"interest\s+coverage",
+    "price_to_earnings_ratio": r"p/e|price[-\s]to[-\s]earnings",
+    "dividend_yield": r"dividend\s+yield",
+}
+METRIC_KEYWORD_PATTERN = re.compile(
+    "|".join(rf"(?P<{metric}>\b(?:{words})\b)" for metric, words in METRIC_KEYWORDS.items())
+)
+
+
+class Value(NamedTuple):
+    start: int
+    end: int
+    value: float
+    unit: str       # UNIT_PERCENT, UNIT_CURRENCY, UNIT_RATIO or "" for a bare number
+
+
+def _number(text: Optional[str]) -> float:
+    return float(text.replace(",", ""))
+
+
+def _scale(text: Optional[str]) -> float:
+    return SCALE_WORDS[text.strip()] if text else 1.0
+
+
+def _end_unit(match: re.Match, end: str) -> Optional[str]:
+    # Unit written at one end of a range ("1" or "2"), or None if it has none
+    if match.group(f"pct{end}") or match.group(f"bps{end}"):
+        return UNIT_PERCENT
+    if match.group(f"cur{end}") or match.group(f"scale{end}"):
+        return UNIT_CURRENCY
+    return None
+
+
+def _is_year(number: str) -> bool:
+    # Calendar and fiscal years ("2025", "2024-2026") are not values
+    return "." not in number and "," not in number and 1900 <= _number(number) <= 2100
+
+
+def _governed_by_decline(text: str, start: int, end: int) -> bool:
+    before = text[max(0, start - DECLINE_CONTEXT_CHARS):start]
+    after = text[end:end + DECLINE_CONTEXT_CHARS]
+    return bool(DECLINE_BEFORE_PATTERN.search(before) or DECLINE_AFTER_PATTERN.search(after))
+
+
+def _split_change(match: re.Match, text: str) -> List[Value]:
+    # "X to Y" read as a change X and a resulting level Y, each with its own unit and span
+    values = []
+    a_end = max(match.end(group) for group in ("a", "pct1", "bps1", "scale1") if match.group(group) is not None)
+    b_start = min(match.start(group) for group in ("sign2", "cur2", "b") if match.group(group) is not None)
+    for end, start, stop in (("1", match.start(), a_end), ("2", b_start, match.end())):
+        number = match.group("a" if end == "1" else "b")
+        value = _number(number) * (-1 if match.group(f"sign{end}") else 1)
+        unit = _end_unit(match, end)
+        if unit == UNIT_PERCENT:
+            if match.group(f"bps{end}"):
+                value /= 100
+            # Only the change can be a decline; the level after "to" keeps its sign
+            if end == "1" and value > 0 and not match.group("sign1") and _governed_by_decline(text, start, stop):
+                value = -value
+        elif unit == UNIT_CURRENCY:
+            value *= _scale(match.group(f"scale{end}"))
+        elif end == "2" and match.group("times"):
+            unit = UNIT_RATIO
+        elif _is_year(number):
+            continue
+        values.append(Value(start, stop, value, unit or ""))
+    return values
+
+
+def _parse_match(match: re.Match, text: str) -> List[Value]:
+    a = _number(match.group("a"))
+    b = _number(match.group("b")) if match.group("b") is not None else None
+    if match.group("sign1"):
+        a = -a
+    if b is not None and match.group("sign2"):
+        b = -b
+    sep = match.group("sep")
+    percent = bool(match.group("pct1") or match.group("pct2") or match.group("bps1") or match.group("bps2"))
+    currency = bool(match.group("cur1") or match.group("cur2"))
+    scaled = bool(match.group("scale1") or match.group("scale2"))
+
+    # "1.5 to 1" and "3:1" are ratios, not ranges
+    if b is not None and not percent and not currency and not scaled and (sep == ":" or (sep == "to" and b == 1)):
+        return [Value(match.start("a"), match.end(), a / b if b else a, UNIT_RATIO)]
+
+    # Ends with different units, or "X to Y" after a change word, are a change and a level
+    if b is not None and not match.group("from"):
+        unit_a, unit_b = _end_unit(match, "1"), _end_unit(match, "2")
+        if unit_a and unit_b and unit_a != unit_b:
+            return _split_change(match, text)
+        before = text[max(0, match.start() - DECLINE_CONTEXT_CHARS):match.start()]
+        if sep == "to" and CHANGE_BEFORE_PATTERN.search(before):
+            return _split_change(match, text)
+
+    # Units written once apply to both ends: "2-5%", "$1.2 to $1.4 billion", "25-50 bps"
+    bps_b = 0.01 if match.group("bps2") else 1.0
+    bps_a = 0.01 if match.group("bps1") else (1.0 if match.group("pct1") else bps_b)
+    a *= bps_a
+    if b is not None:
+        b *= bps_b
+    scale_b = 1.0 if percent else _scale(match.group("scale2"))
+    scale_a = 1.0 if percent else (_scale(match.group("scale1")) if match.group("scale1") else scale_b)
+
+    if b is None:
+        value = a * scale_a
+    elif match.group("from"):
+        # "from 5% to 7%": the projected value is the end point
+        value = b * scale_b
+    else:
+        # "-2%-5%" means a decline of 2 to 5 percent
+        if a < 0 < b and sep != "to":
+            b = -b
+        value = (a * scale_a + b * scale_b) / 2
+
+    if percent:
+        unit = UNIT_PERCENT
+        explicit_sign = match.group("sign1") or match.group("sign2")
+        if not explicit_sign and not match.group("from") and value > 0:
+            if _governed_by_decline(text, match.start(), match.end()):
+                value = -value
+    elif match.group("times"):
+        unit = UNIT_RATIO
+    elif currency or scaled:
+        unit = UNIT_CURRENCY
+    else:
+        unit = ""
+        numbers = [match.group("a")] + ([match.group("b")] if b is not None else [])
+        if all(_is_year(n) for n in numbers):
+            return []
+
+    return [Value(match.start(), match.end(), value, unit)]
+
+
+@lru_cache(maxsize=65536)
+def find_values(text: str) -> Tuple[Value, ...]:
+    """
+    Every numeric value or range in a text, with the extraction rules applied:
+    modifiers ("approximately", "over", "under") dropped, currency symbols and
+    commas removed, thousand/million/billion expanded, ranges reduced to their
+    midpoint, "from X to Y" to Y, "X to 1" to the ratio X, basis points turned
+    into percentages, and percentages governed by decline wording made negative.
+    "X to Y" after a change word or "by", or with different units at each end,
+    is a change X and a resulting level Y rather than a range.
+
+    >>> [value.value for value in find_values("We expect revenue to decrease by 2%-5% next year.")]
+    [-3.5]
+    >>> [value.value for value in find_values("Despite lower costs, we expect gross margin of 25%.")]
+    [25.0]
+    >>> [value.value for value in find_values("After the drop in volumes, growth of 4% is expected.")]
+    [4.0]
+    >>> [value.value for value in find_values("Margins declining to 25% in 2025.")]
+    [25.0]
+    >>> [(value.value, value.unit) for value in find_values("EPS will increase 10% to $3.50.")]
+    [(10.0, 'percent'), (3.5, 'currency')]
+    >>> [value.value for value in find_values("We expect capex to rise 10% to $500 million.")]
+    [10.0, 500000000.0]
+    >>> [value.value for value in find_values("We will decrease capex by $50 million to $450 million.")]
+    [50000000.0, 450000000.0]
+    >>> [value.value for value in find_values("Margins to improve by 100 basis points to approximately 25%.")]
+    [1.0, 25.0]
+    >>> [value.value for value in find_values("We guide revenue of $1.2 to $1.4 billion.")]
+    [1300000000.0]
+    """
+    lowered = text.lower()
+    values = []
+    for match in VALUE_PATTERN.finditer(lowered):
+        values.extend(_parse_match(match, lowered))
+    return tuple(values)
+
+
+def format_value(value: float, unit: str) -> str:
+    """
+    Output format of the extraction CSV: plain numbers, "%" for percentages.
+    """
+    text = f"{round(value, 6):.6f}".rstrip("0").rstrip(".")
+    if text in ("-0", ""):
+        text = "0"
+    return f"{text}%" if unit == UNIT_PERCENT else text
+
+
+def _same(a: float, b: float) -> bool:
+    return abs(a - b) <= RELATIVE_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def _compatible(unit: str, metric: str) -> bool:
+    expected = METRIC_UNITS.get(metric, "")
+    if expected == UNIT_PERCENT:
+        return unit == UNIT_PERCENT
+    return unit in (expected, "")
+
+
+def _tied_to_metric(value: Value, metric: str, sentence: str) -> bool:
+    # True when the metric named closest before the value is this one
+    nearest = None
+    for match in METRIC_KEYWORD_PATTERN.finditer(sentence.lower()):
+        if match.start() >= value.start:
+            break
+        nearest = match.lastgroup
+    return nearest == metric
+
+
+def normalize_metric_value(raw: str, metric: str, sentence: str = "") -> str:
+    """
+    Normalized value of one metric field, checked against the sentence.
+
+    A span quoted from the sentence is normalized in the sentence's context (so
+    "decrease by 2%-5%" gives "-3.5%", and "$50 million to $450 million" after
+    "decrease by" gives the resulting level). A value not found in the sentence
+    is kept if it equals one of the sentence's values; otherwise, if exactly one
+    value of the metric's unit sits after the metric's own name, that value is
+    used instead. Basis points are reported as percentages.
+
+    >>> sentence = ("Our gross margin is expected to remain stable at around 45%, "
+    ...             "while we target operating margin expansion of 50 basis points.")
+    >>> normalize_metric_value("0.5%", "operating_margin", sentence)
+    '0.5%'
+    >>> normalize_metric_value("50", "operating_margin", sentence)
+    '0.5%'
+    >>> normalize_metric_value("50 basis points", "operating_margin", sentence)
+    '0.5%'
+    >>> normalize_metric_value("44%", "gross_margin", sentence)
+    '45%'
+    >>> sentence = "We will decrease capex by $50 million to $450 million."
+    >>> normalize_metric_value("$50 million to $450 million", "capital_expenditure", sentence)
+    '450000000'
+
+    Returns:
+        str: Normalized value, or "" if the field holds no number
+    """
+    raw = str(raw).strip()
+    if not raw:
+        return ""
+
+    candidates = find_values(sentence) if sentence else ()
+    position = sentence.lower().find(raw.lower()) if sentence else -1
+    if position >= 0:
+        overlapping = [c for c in candidates if c.start < position + len(raw) and c.end > position]
+        if overlapping:
+            # A change followed by its resulting level: the level is the metric's value
+            return format_value(overlapping[-1].value, overlapping[-1].unit)
+
+    own = find_values(raw)
+    if not own:
+        return ""
+    value = own[0]
+
+    if candidates and not any(_same(value.value, c.value) for c in candidates):
+        compatible = [c for c in candidates
+                      if _compatible(c.unit, metric) and _tied_to_metric(c, metric, sentence)]
+        if len(compatible) == 1:
+            value = compatible[0]
+
+    unit = value.unit or (UNIT_PERCENT if "%" in raw else "")
+    return format_value(value.value, unit)
+
+
+def normalize_statement(statement: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    Normalize every metric field of an extracted statement from its sentence.
+
+    Returns:
+        tuple: (normalized copy, number of fields whose numeric value changed)
+    """
+    sentence = str(statement.get("sentence") or "")
+    normalized = dict(statement)
+    corrections = 0
+
+    for metric in METRIC_UNITS:
+        raw = statement.get(metric)
+        if raw is None or str(raw).strip() == "":
+            continue
+        value = normalize_metric_value(str(raw), metric, sentence)
+        normalized[metric] = value
+
+        before, _ = parse_metric_value(str(raw), metric)
+        after, _ = parse_metric_value(value, metric) if value else (None, "")
+        if (before is None) != (after is None) or (before is not None and not _same(before, after)):
+            corrections += 1
+
+    return normalized, corrections
+
+
+def normalize_statements(statements: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    results = [normalize_statement(statement) for statement in statements]
+    return [statement for statement, _ in results], sum(corrections for _, corrections in results)